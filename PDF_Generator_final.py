@@ -1,15 +1,19 @@
 from reportlab.lib.pagesizes import letter 
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, PageBreak, Flowable
+from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
-from datetime import datetime
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
-import re
 import os
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from plot_generator import generate_radar_chart
+from plot_generator import score_chart_flowable
+from report_template import get_report_template
+from report_content import build_report_content, metrics_rows
+from report_metrics import stage
+from transcript_appendix import StreamedFlowables, transcript_flowables
+from itertools import chain
 # from LLM_Module.Overall_Analyser import VideoResumeEvaluator 
 # from config import save_path
 
@@ -19,127 +23,245 @@ from plot_generator import generate_radar_chart
 styles = getSampleStyleSheet()
 styles['BodyText'].fontName = 'Helvetica'
 
-def create_combined_pdf(logo_path, json_path, output_pdf_path):
-    presentation_mode = "off"
+def _sibling_json_path(json_path, kind):
+    # "json/<user>_output.json" -> "json/<user>_<kind>.json", "json/output.json" -> "json/<kind>.json"
+    directory, filename = os.path.split(json_path)
+    if filename.endswith("output.json"):
+        filename = filename[:-len("output.json")] + f"{kind}.json"
+    else:
+        filename = f"{kind}.json"
+    return os.path.join(directory, filename)
+
+
+def create_combined_pdf(logo_path, json_path, output_pdf_path, profile="standard"):
     # Read main JSON data
     with open(json_path, 'r') as fp:
         tabular_data = json.load(fp)
-    
-    # Read quality score data for middle column values
-    with open(r'json/scores.json', 'r') as fp:
-        quality_data = json.load(fp)
-        # midval is a list of textual ratings (e.g., "Excellent", "Good", etc.)
-        midval = list(quality_data.values())
-        
-    # Set questions based on presentation mode
-    if presentation_mode == 'on':
-        llm_questions = [
-            "Questions",
-            "Level of Confidence through the presentation",
-            "Did the speaker vary their tone, speed, and volume while delivering the speech/presentation?",
-            "Did the speech have a structure of Opening, Body and Conclusion?",
-            "Was the overall \"Objective\" of the speech delivered clearly?",
-            "Was the content of the presentation/speech to the point, or did it include unnecessary details that may have distracted or confused the audience?",
-            "Was the content of the presentation/speech relevant to the objective of the presentation?",
-            "Was the content of the presentation/speech clear and easy to understand?",
-            "Did the speaker keep the presentation engaging by adding relevant examples, anecdotes and data to back their content?",
-            "Did the speaker demonstrate credibility? Will you trust the speaker?",
-            "Did the speaker explain how the speech or topic of the presentation would benefit the audience and what they could gain from it?",
-            "Did the speaker make an emotional connection with the audience?",
-            "Overall, were you convinced/ persuaded with the speaker’s view on the topic?"
-        ]
-    else:
-        llm_questions = [
-            "Questions",
-            "Level of Confidence through the presentation",
-            "Did the speaker vary their tone, speed, volume?",
-            "Who are you and what are your skills, expertise, personality traits?",
-            "Why are you the best person to fit this role?",
-            "How are you different from others?",
-            "What value do you bring to the role?",
-            "Did the speech have a structure of Opening, Body and Conclusion?",
-            "How was the quality of research for the topic?\nDid the student’s speech demonstrate a good depth?\nDid they cite the sources of research properly?",
-            "How creatively did the student present the video?",
-            "How convinced were you with the overall speech on the topic?\nWas it persuasive?\nWill you give them the job/opportunity?"
-        ]
-
-    def clean_answer(answer):
-        return re.sub(r'^\d+\.\s*', '', answer).strip()
-
-    llm_answers = []
-    if 'LLM' in tabular_data:
-        llm_answers = re.split(r'\n(?=\d+\.)', tabular_data['LLM'])
-
-    # Score mapping for textual ratings to numeric values
-    score_mapping = {
-        "Excellent": 5,
-        "Good": 4,
-        "Satisfactory": 3,
-        "Needs Improvement": 2,
-        "Poor": 1
-    }
-    # Compute total score and maximum possible score
-    total_score = 0
-    max_score = len(midval) * 5  # Maximum score is 5 per question
-    for rating in midval:
-        total_score += score_mapping.get(rating, 0)
-    
-    # Calculate prorated score (out of 100)
-    if max_score > 0:
-        prorated_score = round((total_score / max_score) * 100)
+
+    # Read the score/quality/presentation files written next to the main JSON
+    with open(_sibling_json_path(json_path, "scores"), 'r') as fp:
+        scores_data = json.load(fp)
+    try:
+        with open(_sibling_json_path(json_path, "quality"), 'r') as fp:
+            quality_data = json.load(fp)
+    except (OSError, ValueError):
+        quality_data = None
+    try:
+        with open(_sibling_json_path(json_path, "presentation"), 'r') as fp:
+            presentation_mode = json.load(fp).get("presentation_mode", "off")
+    except (OSError, ValueError):
+        presentation_mode = "off"
+
+    if profile == "compact":
+        pdf_bytes, rendered_size = render_combined_pdf(logo_path, tabular_data, scores_data, quality_data,
+                                                       presentation_mode=presentation_mode, profile=profile)
+        with open(output_pdf_path, 'wb') as fp:
+            fp.write(pdf_bytes)
+        print(f"PDF size: {rendered_size} bytes rendered, {len(pdf_bytes)} bytes after optimization")
     else:
-        prorated_score = 0
+        build_combined_pdf(logo_path, tabular_data, scores_data, quality_data,
+                           output_pdf_path, presentation_mode=presentation_mode)
+    print("PDF generated successfully with dynamic table and bullet-point feedback!")
+
+
+def render_combined_pdf(logo_path, tabular_data, scores_data, quality_data, presentation_mode="off",
+                        profile="standard", transcript=None):
+    # Returns the PDF bytes and the size ReportLab produced before the compact
+    # profile's optimization pass (the same number for the standard profile)
+    buffer = BytesIO()
+    build_combined_pdf(logo_path, tabular_data, scores_data, quality_data,
+                       buffer, presentation_mode=presentation_mode, profile=profile, transcript=transcript)
+    pdf_bytes = buffer.getvalue()
+    if profile == "compact":
+        # Imported here: pypdf is slow to load and only the compact profile needs it
+        from pdf_optimize import optimize_pdf
+        with stage("optimize"):
+            return optimize_pdf(pdf_bytes), len(pdf_bytes)
+    return pdf_bytes, len(pdf_bytes)
+
+
+def create_combined_pdf_buffer(logo_path, tabular_data, scores_data, quality_data, presentation_mode="off",
+                               profile="standard", transcript=None):
+    # Same report as create_combined_pdf, but built from already parsed dicts
+    # into memory, so nothing is written to or read back from json/. A transcript
+    # (list of {start, end, text} segments) adds the transcript appendix.
+    pdf_bytes, _ = render_combined_pdf(logo_path, tabular_data, scores_data, quality_data,
+                                       presentation_mode=presentation_mode, profile=profile,
+                                       transcript=transcript)
+    return BytesIO(pdf_bytes)
+
+
+def _render_candidate(logo_path, candidate, profile="standard"):
+    return create_combined_pdf_buffer(logo_path, profile=profile, **candidate).getvalue()
+
+
+def _render_candidate_in_slot(slot, executor, logo_path, candidate, profile):
+    # Holds slot while the candidate renders, here or on executor
+    with slot:
+        if executor is None:
+            return _render_candidate(logo_path, candidate, profile)
+        return executor.submit(_render_candidate, logo_path, candidate, profile).result()
+
+
+def create_combined_pdf_batch(logo_path, candidates, executor=None, workers=4, profile="standard", slots=None):
+    # candidates is a list of dicts with the create_combined_pdf_buffer arguments
+    # (tabular_data, scores_data, quality_data and optionally presentation_mode
+    # and transcript). slots is an optional list of context managers, one per
+    # candidate, held around its render (e.g. scheduler slots); up to workers
+    # candidates wait for theirs at a time.
+    # Yields {"index", "name", "pdf"} or {"index", "name", "error"} per candidate
+    # in completion order; one failing candidate does not stop the batch.
+    render_executor = executor
+    own_executor = executor is None or slots is not None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {}
+        for index, candidate in enumerate(candidates):
+            if slots is None:
+                future = executor.submit(_render_candidate, logo_path, candidate, profile)
+            else:
+                future = executor.submit(_render_candidate_in_slot, slots[index], render_executor, logo_path,
+                                         candidate, profile)
+            futures[future] = index
+        for future in as_completed(futures):
+            index = futures[future]
+            name = candidates[index]["tabular_data"].get("User Name", "Unknown Candidate")
+            try:
+                yield {"index": index, "name": name, "pdf": future.result()}
+            except Exception as e:
+                yield {"index": index, "name": name, "error": str(e)}
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+class _Bookmark(Flowable):
+    # Zero-size flowable that adds a top-level outline entry at its position
+    def __init__(self, key, title):
+        Flowable.__init__(self)
+        self.key = key
+        self.title = title
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=0)
+
+
+def _merged_document(logo_path, candidates, indexes, profile, errors):
+    # Lays out the candidates at indexes into one PDF and returns its bytes;
+    # candidates whose flowables cannot be built are skipped into errors
+    parts = []  # flowable lists and transcript appendix generators, in document order
+    for index in indexes:
+        candidate = dict(candidates[index])
+        name = candidate["tabular_data"].get("User Name", "Unknown Candidate")
+        transcript = candidate.pop("transcript", None)
+        try:
+            template = get_report_template(candidate.get("presentation_mode", "off"), logo_path, profile=profile)
+            candidate_flowables = combined_report_flowables(template=template, **candidate)
+        except Exception as e:
+            errors.append({"index": index, "name": name, "error": str(e)})
+            continue
+        if parts:
+            parts.append([PageBreak()])
+        parts.append([_Bookmark(f"candidate-{index}", name)])
+        parts.append(candidate_flowables)
+        if transcript is not None:
+            parts.append(transcript_flowables(transcript, template))
+
+    buffer = BytesIO()
+    doc = report_doc(buffer, profile)
+    add_header_footer = get_report_template(logo_path=logo_path, profile=profile).header_footer
+    if not parts:
+        parts.append([Paragraph("No reports could be generated.", styles['BodyText'])])
+    doc.build(StreamedFlowables([], chain.from_iterable(parts)),
+              onFirstPage=add_header_footer, onLaterPages=add_header_footer)
+    return buffer.getvalue()
+
+
+def create_combined_pdf_merged(logo_path, candidates, profile="standard"):
+    # All candidates in one PDF, each starting on a new page with its own bookmark.
+    # Returns the PDF buffer and a list of {"index", "name", "error"} for skipped candidates.
+    errors = []
+    indexes = range(len(candidates))
+    try:
+        pdf_bytes = _merged_document(logo_path, candidates, indexes, profile, errors)
+    except Exception:
+        # A candidate that cannot be laid out (e.g. a LayoutError for a table row
+        # taller than a page) fails the whole document. Lay each one out on its
+        # own to find the failures, then build the document without them.
+        skipped = {error["index"] for error in errors}
+        fitting = []
+        for index in indexes:
+            if index in skipped:
+                continue
+            try:
+                _merged_document(logo_path, candidates, [index], profile, [])
+            except Exception as e:
+                name = candidates[index]["tabular_data"].get("User Name", "Unknown Candidate")
+                errors.append({"index": index, "name": name, "error": str(e)})
+            else:
+                fitting.append(index)
+        errors.sort(key=lambda error: error["index"])
+        pdf_bytes = _merged_document(logo_path, candidates, fitting, profile, [])
+    if profile == "compact":
+        from pdf_optimize import optimize_pdf
+        pdf_bytes = optimize_pdf(pdf_bytes)
+    return BytesIO(pdf_bytes), errors
+
+
+def report_doc(output, profile="standard"):
+    # output may be a file path or a writable file-like object
+    return SimpleDocTemplate(output,
+                             pagesize=letter,
+                             topMargin=1.5*inch,
+                             bottomMargin=0.8*inch,
+                             # None keeps ReportLab's default (rl_config.pageCompression)
+                             pageCompression=1 if profile == "compact" else None)
+
+
+def build_combined_pdf(logo_path, tabular_data, scores_data, quality_data, output, presentation_mode="off",
+                       profile="standard", transcript=None):
+    template = get_report_template(presentation_mode, logo_path, profile=profile)
+    doc = report_doc(output, profile)
+    with stage("flowables"):
+        flowables = combined_report_flowables(tabular_data, scores_data, quality_data, template=template)
+    if transcript is not None:
+        # Appendix paragraphs are created during layout, a few at a time
+        flowables = StreamedFlowables(flowables, transcript_flowables(transcript, template))
+    with stage("layout"):
+        doc.build(flowables,
+                  onFirstPage=template.header_footer,
+                  onLaterPages=template.header_footer)
+
+
+def combined_report_flowables(tabular_data, scores_data, quality_data, presentation_mode="off", template=None):
+    if template is None:
+        template = get_report_template(presentation_mode)
+    content = build_report_content(tabular_data, scores_data, quality_data, template=template)
+    flowables = summary_flowables(tabular_data, scores_data, quality_data, template, content)
+    flowables.append(PageBreak())
+    flowables.extend(metrics_flowables(tabular_data, scores_data, template, content))
+    return flowables
+
+
+def summary_flowables(tabular_data, scores_data, quality_data, template, content=None):
+    # Page 1: title, Influence Quotient, chart and qualitative bullets
+    if content is None:
+        content = build_report_content(tabular_data, scores_data, quality_data, template=template)
+    section_style = template.section_style
+    normal_style = template.normal_style
 
-    # Create document using the passed output path
-    doc = SimpleDocTemplate(output_pdf_path, 
-                            pagesize=letter,
-                            topMargin=1.5*inch,
-                            bottomMargin=0.8*inch)
     flowables = []
-    styles = getSampleStyleSheet()
-
-    def add_header_footer(canvas, doc):
-        canvas.saveState()
-        logo = Image(logo_path, width=2*inch, height=1*inch)
-        logo.drawOn(canvas, (letter[0]-2*inch)/2, letter[1]-1.2*inch)
-        website_text = "https://some.education.in"
-        canvas.setFont("Helvetica", 9)
-        canvas.linkURL("https://some.education.in",
-                       (0.5*inch, 0.3*inch, 2.5*inch, 0.5*inch),
-                       relative=1)
-        canvas.drawString(0.5*inch, 0.3*inch, website_text)
-        page_num = canvas.getPageNumber()
-        canvas.drawRightString(letter[0]-0.5*inch, 0.3*inch, f"Page {page_num}")
-        canvas.restoreState()
-
-    # Define styles
-    section_style = ParagraphStyle(
-        'SectionStyle',
-        parent=styles['BodyText'],
-        fontName='Helvetica-Bold',
-        fontSize=10,
-        spaceAfter=12,
-        leading=16
-    )
-    bullet_style = ParagraphStyle(
-        'BulletStyle',
-        parent=styles['BodyText'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=6,
-        leftIndent=10,
-        bulletIndent=0,
-        firstLineIndent=0
-    )
 
     # Candidate name and date at the top
-    name = tabular_data.get('User Name', 'Unknown Candidate')
-    now = datetime.now()
-    formatted_date = now.strftime("%d %B %Y")
     title = Paragraph(
-        f"<para alignment='center'><b>{name}</b><br/></para>"
-        f"<para alignment='center'>{formatted_date}</para>", 
-        styles['Title']
+        f"<para alignment='center'><b>{content['name']}</b><br/></para>"
+        f"<para alignment='center'>{content['date']}</para>", 
+        template.title_style
     )
     flowables.append(title)
     flowables.append(Spacer(1, 12))
@@ -150,27 +272,21 @@ def create_combined_pdf(logo_path, json_path, output_pdf_path):
     flowables.append(Paragraph("<b>Assessment</b>", section_style))
     flowables.append(Spacer(1, 6))
 
-# New style for Influence Quotient
-    iq_style = ParagraphStyle(
-        'IQStyle',
-        parent=styles['BodyText'],
-        fontName='Helvetica-Bold',
-        fontSize=14,      # slightly larger
-        spaceAfter=12
-    )
-
 # Only the prorated score, rounded, labeled “Influence Quotient”
     flowables.append(
-        Paragraph(f"<b>Influence Quotient: {prorated_score}/100</b>", iq_style)
+        Paragraph(f"<b>Influence Quotient: {content['influence_quotient']}/100</b>", template.iq_style)
     )
+    if content['cohort'] is not None:
+        flowables.append(Paragraph(
+            f"Percentile vs cohort: {content['cohort']['percentile']} "
+            f"(of {content['cohort']['size'] or 'N/A'} candidates)", normal_style))
     flowables.append(Spacer(1, 16))
 
     
     try:
-        generate_radar_chart("output.png")
-        if not os.path.exists("output.png"):
-            raise FileNotFoundError("Radar chart image 'output.png' was not generated.")
-        chart_img = Image('output.png', width=6*inch, height=3*inch)
+        with stage("chart"):
+            chart_img = score_chart_flowable(scores_data, width=6*inch, height=3*inch,
+                                             backend=template.chart_backend)
         flowables.append(Paragraph("Overall Evaluation Summary", section_style))
         flowables.append(chart_img)
         flowables.append(Spacer(1, 18))
@@ -186,41 +302,37 @@ def create_combined_pdf(logo_path, json_path, output_pdf_path):
         flowables.append(Paragraph(title_text, section_style))
         bullet_list = []
         for item in items:
-            bullet_list.append(Paragraph(f"•{item}", bullet_style))
+            bullet_list.append(Paragraph(f"•{item}", template.bullet_style))
         flowables.extend(bullet_list)
         flowables.append(Spacer(1, 16))
-    
-    try:
-        with open(r'json/quality.json', 'r') as fp: 
-            quality_data_tmp = json.load(fp)
-        add_quality_section("Qualitative Analysis - Positive", quality_data_tmp["Qualitative Analysis"])
-        add_quality_section("Qualitative Analysis - Areas of Improvement", quality_data_tmp["Quantitative Analysis"])
-    except:
-        pass
+
+    qualitative = content['qualitative']
+    if qualitative['positive'] is not None:
+        add_quality_section("Qualitative Analysis - Positive", qualitative['positive'])
+    if qualitative['improvement'] is not None:
+        add_quality_section("Qualitative Analysis - Areas of Improvement", qualitative['improvement'])
 
     flowables.append(Spacer(1, 18))
-    flowables.append(PageBreak())
+    return flowables
+
+
+def metrics_flowables(tabular_data, scores_data, template, content=None):
+    # The Detailed Evaluation Metrics heading and table
+    if content is None:
+        content = {"metrics": metrics_rows(tabular_data, scores_data, template)}
+    section_style = template.section_style
+    normal_style = template.normal_style
+    feedback_bullet_style = template.feedback_bullet_style
+
+    flowables = []
 
     # Heading for the Evaluation Metrics table
-    section_style_table = ParagraphStyle('SectionStyle', parent=styles['BodyText'], 
-                                          fontName='Helvetica-Bold', fontSize=10, spaceAfter=12, leading=16)
-    flowables.append(Paragraph("<b>Detailed Evaluation Metrics</b>", section_style_table))
+    flowables.append(Paragraph("<b>Detailed Evaluation Metrics</b>", section_style))
     flowables.append(Spacer(1, 24))
 
-    normal_style = ParagraphStyle('NormalStyle', parent=styles['BodyText'], fontSize=10, leading=12, spaceAfter=6)
-    bold_style = ParagraphStyle('BoldStyle', parent=normal_style, fontName='Helvetica-Bold')
-    feedback_bullet_style = ParagraphStyle(
-        'FeedbackBulletStyle',
-        parent=normal_style,
-        fontSize=10,
-        leading=12,
-        leftIndent=10,
-        bulletIndent=0,
-        spaceAfter=4
-    )
-
     # Create table with the requested structure:
     # Columns: No. | Individual Parameters | 5 Point Scale (header description) | Feedback
+    bold_style = template.bold_style
     table_data = [
     [
         Paragraph("<b>No.</b>", bold_style),
@@ -231,79 +343,24 @@ def create_combined_pdf(logo_path, json_path, output_pdf_path):
 ]
 
 
-    for i, question in enumerate(llm_questions[1:], 1):
-        # For the middle column, display only the numeric score (if available)
-        if i <= len(midval) and midval[i - 1] in score_mapping:
-            numeric_score = str(score_mapping[midval[i - 1]])
-        else:
-            numeric_score = "N/A"
-            
-        if i == 1:
-            sub_items = [
-                ("Posture", "posture"),
-                ("Smile", "Smile Score"),
-                ("Eye Contact", "Eye Contact"),
-                ("Energy levels through the presentation", "Energy levvels through the presentation")
-            ]
-            items_text = "Level of Confidence through the presentation<br/>" + "<br/>".join([f"• {item[0]}" for item in sub_items])
-            scores = []
-            for item in sub_items:
-                key = item[1]
-                metric_value = tabular_data.get(key)
-                if metric_value in [1, 2, 3, 4, 5]:
-                    scores.append(f"{item[0]}: {metric_value}")
-                else:
-                    scores.append(f"{item[0]}: N/A")
-            # Format scores as bullet points
-            scores_text = "<br/>".join([f" {s}" for s in scores])
-            table_data.append([
-                Paragraph(f"{i}.", normal_style),
-                Paragraph(items_text, normal_style),
-                Paragraph(numeric_score, normal_style),
-                Paragraph(scores_text, feedback_bullet_style)
-            ])
-        else:
-            answer_index = i if i < len(llm_answers) else None
-            if answer_index is not None:
-                answer = clean_answer(llm_answers[answer_index])
-                # Split the answer into lines for bullet points
-                answer_lines = [line.strip() for line in answer.split('\n') if line.strip()]
-                if not answer_lines:
-                    answer_lines = ["N/A"]
-            else:
-                answer_lines = ["N/A"]
-            # Format each line as a bullet point
-            feedback_text = "<br/>".join([f" {line}" for line in answer_lines])
-            table_data.append([
-                Paragraph(f"{i}.", normal_style),
-                Paragraph(question, normal_style),
-                Paragraph(numeric_score, normal_style),
-                Paragraph(feedback_text, feedback_bullet_style)
-            ])
+    for row in content['metrics']:
+        parameter_text = row['parameter']
+        if row['sub_items']:
+            parameter_text += "<br/>" + "<br/>".join([f"• {item}" for item in row['sub_items']])
+        # Format each feedback line as a bullet point
+        feedback_text = "<br/>".join([f" {line}" for line in row['feedback']])
+        table_data.append([
+            Paragraph(f"{row['number']}.", normal_style),
+            Paragraph(parameter_text, normal_style),
+            Paragraph(row['score'], normal_style),
+            Paragraph(feedback_text, feedback_bullet_style)
+        ])
 
     # Create table with defined column widths (adjust as needed)
-    table = Table(table_data, colWidths=[40, 250, 80, 200])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    table = Table(table_data, colWidths=list(template.table_col_widths))
+    table.setStyle(template.table_style)
     flowables.append(table)
-
-    doc.build(flowables,
-              onFirstPage=add_header_footer,
-              onLaterPages=add_header_footer)
-
-    print("PDF generated successfully with dynamic table and bullet-point feedback!")
-    # Optionally remove the temporary file if needed:
-    # os.remove(save_path)
+    return flowables
 
 if __name__ == "__main__":
     create_combined_pdf(r"logos/logo.png", r"json/output.json", r"reports/combined_report.pdf")
\ No newline at end of file
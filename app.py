@@ -1,8 +1,23 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+from werkzeug.utils import secure_filename
 import os
-from PDF_Generator_final import create_combined_pdf
-import tempfile
+from io import BytesIO
+from report_cache import ReportCache, canonical_cache_key
+from report_ingest import PayloadError, parse_body, parse_output_format, parse_report_request, valid_cohort_id
+from report_metrics import (COALESCED_REQUESTS, ERRORS, PDF_BYTES, RENDERS_IN_FLIGHT, Gauge, register,
+                            render_prometheus, sampled_profile, stage)
+from report_jobs import LocalJobQueue, QueueFull, DONE, FAILED
+from request_coalescing import IdempotencyMismatch, IdempotencyStore, SingleFlight, valid_idempotency_key
+from render_scheduler import BULK, INTERACTIVE, FairScheduler, Throttled
+import config
+import render_pool
 import json
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 app = Flask(__name__)
 
@@ -10,58 +25,666 @@ app = Flask(__name__)
 REPORTS_DIR = os.path.join(app.root_path, "reports")
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# Finished PDFs keyed on the request payload
+report_cache = None
+if config.CACHE_MAX_BYTES > 0:
+    report_cache = ReportCache(max_bytes=config.CACHE_MAX_BYTES, ttl=config.CACHE_TTL,
+                               directory=config.CACHE_DIR or None,
+                               disk_max_bytes=config.CACHE_DISK_MAX_BYTES)
+
+# Background writer for the copies saved under reports/
+persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-persist")
+
+# Bounded worker pool for reports submitted in job mode
+report_queue = LocalJobQueue(workers=config.JOB_WORKERS,
+                             max_queued=config.JOB_QUEUE_SIZE,
+                             result_ttl=config.JOB_RESULT_TTL)
+register(Gauge("report_queue_depth", "Reports waiting in the job queue.", callback=report_queue.depth))
+
+# Concurrent requests for the same payload share one render, and requests sent
+# with an Idempotency-Key have their outcome replayed to retries
+render_flights = SingleFlight()
+idempotency_store = None
+if config.IDEMPOTENCY_TTL > 0:
+    idempotency_store = IdempotencyStore(max_bytes=config.IDEMPOTENCY_MAX_BYTES, ttl=config.IDEMPOTENCY_TTL)
+
+# Per-tenant admission and weighted fair ordering of PDF renders
+scheduler = None
+if config.SCHEDULER_SLOTS > 0:
+    scheduler = FairScheduler(slots=config.SCHEDULER_SLOTS,
+                              weights={INTERACTIVE: config.SCHEDULER_INTERACTIVE_WEIGHT,
+                                       BULK: config.SCHEDULER_BULK_WEIGHT},
+                              rate=config.SCHEDULER_RATE, burst=config.SCHEDULER_BURST,
+                              max_queued=config.SCHEDULER_MAX_QUEUED,
+                              max_queued_per_tenant=config.SCHEDULER_MAX_QUEUED_PER_TENANT,
+                              max_wait=config.SCHEDULER_MAX_WAIT)
+
+
+_cohort_store = None
+_lazy_init_lock = threading.Lock()
+
+
+def get_cohort_store():
+    # Created on first use so numpy is only imported when cohorts are in play
+    global _cohort_store
+    with _lazy_init_lock:
+        if _cohort_store is None:
+            from cohort_analytics import CohortStore
+            _cohort_store = CohortStore(config.COHORT_DIR)
+        return _cohort_store
+
+
+_report_store = None
+
+
+def get_report_store():
+    # Opened on first save so importing the app does not touch the index
+    global _report_store
+    with _lazy_init_lock:
+        if _report_store is None:
+            from report_store import ReportStore
+            _report_store = ReportStore(config.STORE_DIR or REPORTS_DIR, max_bytes=config.STORE_MAX_BYTES,
+                                        max_age=config.STORE_MAX_AGE, max_versions=config.STORE_MAX_VERSIONS)
+            _report_store.start_retention(config.STORE_SWEEP_SECONDS)
+        return _report_store
+
+
+_incremental_renderer = None
+
+
+def get_incremental_renderer():
+    # None when pypdf, which merges the cached segments, is not installed
+    global _incremental_renderer
+    with _lazy_init_lock:
+        if _incremental_renderer is None:
+            import incremental_render
+            if not incremental_render.available():
+                print("REPORT_INCREMENTAL_RENDER is set but pypdf is not installed; rendering full reports")
+                config.INCREMENTAL_RENDER = False
+                return None
+            _incremental_renderer = incremental_render.IncrementalRenderer(
+                max_bytes=config.SEGMENT_CACHE_MAX_BYTES, ttl=config.CACHE_TTL)
+        return _incremental_renderer
+
+
+def prepare_report(report_request):
+    # Generator arguments and cache key fields for a decoded request
+    candidate = report_request.to_candidate()
+    cache_fields = report_request.canonical_fields()
+    # Profiles produce different bytes for the same payload
+    cache_fields["pdf_profile"] = config.PDF_PROFILE
+    if report_request.cohort is not None:
+        # The standing the candidate will have once recorded; nothing is written
+        # here, only when a report is actually rendered (record_cohort_member)
+        percentile, size = get_cohort_store().standing(report_request.cohort, report_request.user_name,
+                                                       report_request.scores.ratings,
+                                                       report_request.video.metrics)
+        percentile = round(percentile)
+        candidate["tabular_data"].update({"Cohort Percentile": percentile, "Cohort Size": size})
+        # The cohort standing is printed, so a change in it must miss the cache
+        cache_fields["cohort_percentile"] = [percentile, size]
+    return candidate, cache_fields
+
+
+def with_speech_metrics(candidate, transcript):
+    # The candidate with delivery metrics measured from its transcript. Called
+    # only when a report is actually rendered: the transcript is already part of
+    # the cache key, so 304s and cache hits skip the analysis.
+    if not config.SPEECH_METRICS or transcript is None:
+        return candidate
+    from speech_metrics import analyze_transcript
+    with stage("speech_metrics"):
+        speech_metrics = analyze_transcript(transcript)
+    if speech_metrics is None:
+        return candidate
+    tabular_data = dict(candidate["tabular_data"])
+    tabular_data["Speech Metrics"] = speech_metrics
+    return dict(candidate, tabular_data=tabular_data)
+
+
+def record_cohort_member(report_request):
+    # Adds the candidate to its cohort once its PDF has been produced or its job
+    # queued; 304s, HTML/JSON previews, idempotent replays, rejected requests
+    # and failed renders never get here
+    if report_request.cohort is not None:
+        get_cohort_store().add(report_request.cohort, report_request.user_name,
+                               report_request.scores.ratings, report_request.video.metrics)
+
+
+def parse_report_payload(data):
+    # Decode and validate the payload once and return the generator arguments
+    report_request = parse_report_request(data)
+    return with_speech_metrics(prepare_report(report_request)[0], report_request.transcript)
+
+
+def persist_report(user_name, pdf_bytes):
+    # Save the report as the candidate's next stored version
+    with stage("persist"):
+        return get_report_store().save(user_name, pdf_bytes)
+
+
+def _persist_report_logged(user_name, pdf_bytes):
+    try:
+        persist_report(user_name, pdf_bytes)
+    except Exception as e:
+        print(f"Failed to save report for {user_name}: {e}")
+
+
+def render_report(candidate, transcript=None):
+    # Generate PDF in memory, on the render process pool when one is configured.
+    # Returns the PDF and its size before the compact profile's optimization pass.
+    profile = config.PDF_PROFILE
+    candidate = with_speech_metrics(candidate, transcript)
+    with RENDERS_IN_FLIGHT.track(), stage("render"):
+        if config.RENDER_PROCESSES > 0:
+            pdf_bytes, rendered_size = render_pool.render_pdf(config.RENDER_PROCESSES, "logos/logo.png",
+                                                              profile=profile, **candidate)
+        elif config.INCREMENTAL_RENDER and get_incremental_renderer() is not None:
+            pdf_bytes = get_incremental_renderer().render("logos/logo.png", profile=profile, **candidate).getvalue()
+            rendered_size = len(pdf_bytes)
+            if profile == "compact":
+                from pdf_optimize import optimize_pdf
+                with stage("optimize"):
+                    pdf_bytes = optimize_pdf(pdf_bytes)
+        else:
+            from PDF_Generator_final import render_combined_pdf
+            pdf_bytes, rendered_size = render_combined_pdf("logos/logo.png", profile=profile, **candidate)
+    PDF_BYTES.observe(len(pdf_bytes))
+
+    # Saving to reports/ is a side effect the response does not wait for
+    user_name = candidate["tabular_data"]["User Name"]
+    if config.PERSIST_REPORTS == "sync":
+        persist_report(user_name, pdf_bytes)
+    elif config.PERSIST_REPORTS == "async":
+        persist_executor.submit(_persist_report_logged, user_name, pdf_bytes)
+    return pdf_bytes, rendered_size
+
+
+def render_slot(tenant, priority):
+    # Held around each actual render; queued jobs wait for their turn however long it takes
+    if scheduler is None or tenant is None:
+        return nullcontext()
+    return scheduler.slot(tenant, priority, max_wait=0 if priority == BULK else None)
+
+
+def _render_report_cached(candidate, cache_key, tenant, priority, transcript):
+    if report_cache is not None and cache_key is not None:
+        pdf_bytes = report_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return pdf_bytes, None
+    with render_slot(tenant, priority):
+        pdf_bytes, rendered_size = render_report(candidate, transcript)
+    if report_cache is not None and cache_key is not None:
+        report_cache.put(cache_key, pdf_bytes)
+    return pdf_bytes, rendered_size
+
+
+def render_report_cached(candidate, cache_key=None, flight_key=None, tenant=None, priority=INTERACTIVE,
+                         transcript=None):
+    # Serve repeated payloads from the cache instead of rendering them again, and
+    # let concurrent requests for one payload wait on a single render instead of
+    # each rendering (and persisting) it. flight_key identifies the payload when
+    # the cache is disabled; it defaults to cache_key. Renders for a tenant go
+    # through the scheduler; Throttled is raised when it turns one away. The
+    # transcript is analyzed for speech metrics only if the report is rendered.
+    # The rendered size is only known (not None) when the report was rendered now.
+    flight_key = flight_key or cache_key
+    if flight_key is None:
+        return _render_report_cached(candidate, cache_key, tenant, priority, transcript)
+    result, shared = render_flights.do(flight_key, _render_report_cached, candidate, cache_key, tenant, priority,
+                                       transcript)
+    if shared:
+        COALESCED_REQUESTS.inc(reason="in_flight")
+    return result
+
+
+def render_needed(cache_key, flight_key):
+    # False when the PDF is cached or an identical render is already in flight,
+    # so the request would not hold a render slot
+    if report_cache is not None and cache_key is not None and report_cache.get(cache_key) is not None:
+        return False
+    return not render_flights.in_flight(flight_key or cache_key)
+
+
+def render_report_job(candidate, cache_key=None, flight_key=None, tenant=None, transcript=None):
+    try:
+        return render_report_cached(candidate, cache_key, flight_key, tenant, BULK, transcript)[0]
+    except Exception:
+        ERRORS.inc(endpoint="job")
+        raise
+
+
+def pdf_size_headers(pdf_bytes, rendered_size=None):
+    # Output profile and PDF size before/after its optimization pass; "before"
+    # is only known when the report was rendered for this request
+    headers = {"X-PDF-Profile": config.PDF_PROFILE, "X-PDF-Size-After": str(len(pdf_bytes))}
+    if rendered_size is not None:
+        headers["X-PDF-Size-Before"] = str(rendered_size)
+    return headers
+
+
+def pdf_response(pdf_bytes, etag=None, download_name="combined_report.pdf", rendered_size=None):
+    # Streams straight from the in-memory PDF with its Content-Length set.
+    # ReportLab assembles the whole document in memory on save anyway, so a
+    # spooled temp file would only add a disk round trip.
+    response = send_file(BytesIO(pdf_bytes), as_attachment=True, download_name=download_name, mimetype="application/pdf")
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"private, max-age={config.CACHE_TTL}"
+    response.headers.update(pdf_size_headers(pdf_bytes, rendered_size))
+    return response
+
+
+def document_etag(cache_key, output_format):
+    # HTML/JSON share the PDF's payload key, tagged with the format
+    if cache_key is None or output_format == "pdf":
+        return cache_key
+    return f"{cache_key}-{output_format}"
+
+
+def render_document(candidate, output_format, transcript=None):
+    # HTML/JSON skip ReportLab layout and are cheap, so they are neither cached nor persisted
+    from report_formats import render_document as render
+    candidate = with_speech_metrics(candidate, transcript)
+    with stage(f"render_{output_format}"):
+        return render(candidate, output_format)
+
+
+def document_response(body, output_format, etag=None):
+    from report_formats import MIMETYPES
+    response = Response(body, mimetype=MIMETYPES[output_format])
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"private, max-age={config.CACHE_TTL}"
+    return response
+
+
+def report_outcome(report_request, candidate, output_format, job_mode, cache_key, payload_key, tenant,
+                   admitted=False):
+    # What a /create_report request produces, as (kind, value, size in bytes):
+    # ("pdf", (pdf bytes, rendered size), ...), ("document", body, ...) or ("job", job id, 0).
+    # Raises QueueFull when job mode cannot queue the render, and Throttled when
+    # the tenant is over its PDF request rate or the scheduler turns the render away.
+    # admitted: the caller already charged the request to the tenant's rate; a
+    # caller that also holds the render slot passes no tenant.
+    if output_format != "pdf":
+        body = render_document(candidate, output_format, report_request.transcript)
+        return "document", body, len(body)
+    if scheduler is not None and not admitted:
+        scheduler.admit(tenant, BULK if job_mode else INTERACTIVE)
+    if job_mode:
+        job = report_queue.submit(render_report_job, candidate, cache_key, payload_key, tenant,
+                                  report_request.transcript)
+        record_cohort_member(report_request)
+        return "job", job.id, 0
+    pdf_bytes, rendered_size = render_report_cached(candidate, cache_key, payload_key, tenant, INTERACTIVE,
+                                                    report_request.transcript)
+    record_cohort_member(report_request)
+    return "pdf", (pdf_bytes, rendered_size), len(pdf_bytes)
+
+
+def idempotency_fingerprint(report_request, output_format, job_mode):
+    # Only what the client sent: server-derived fields such as the cohort
+    # standing change as other candidates arrive and must not turn a retry into
+    # a mismatch. Keyed without the date, so a retry across midnight still matches.
+    client_fields = dict(report_request.canonical_fields(), pdf_profile=config.PDF_PROFILE)
+    return f"{canonical_cache_key(client_fields, date='')}:{output_format}:{job_mode}"
+
+
+def idempotent_replay(idempotency_key, report_request, output_format, job_mode):
+    # The stored outcome for a retried Idempotency-Key, or None; raises
+    # IdempotencyMismatch when the key was used for a different request
+    if idempotency_key is None or idempotency_store is None:
+        return None
+    outcome = idempotency_store.get(idempotency_key, idempotency_fingerprint(report_request, output_format, job_mode))
+    if outcome is not None:
+        COALESCED_REQUESTS.inc(reason="idempotent")
+    return outcome
+
+
+def idempotent_report_outcome(idempotency_key, report_request, candidate, output_format, job_mode, cache_key,
+                              payload_key, tenant, admitted=False):
+    # report_outcome, replayed from the idempotency store for a retried
+    # Idempotency-Key. Returns (outcome, replayed); raises IdempotencyMismatch
+    # when the key was used for a different request.
+    args = (report_request, candidate, output_format, job_mode, cache_key, payload_key, tenant, admitted)
+    if idempotency_key is None or idempotency_store is None:
+        return report_outcome(*args), False
+    fingerprint = idempotency_fingerprint(report_request, output_format, job_mode)
+    outcome, replayed = idempotency_store.run(idempotency_key, fingerprint, report_outcome, *args)
+    if replayed:
+        COALESCED_REQUESTS.inc(reason="idempotent")
+    return outcome, replayed
+
+
+def request_tenant(tenant_id, cohort, client_address):
+    # Scheduling tenant: the X-Tenant-ID header, else the cohort, else the client
+    # address (not the candidate, which every request can change at will).
+    # None when the header is present but malformed.
+    if tenant_id is not None:
+        return f"tenant:{tenant_id}" if valid_cohort_id(tenant_id) else None
+    if cohort is not None:
+        return f"cohort:{cohort}"
+    return f"client:{client_address or 'unknown'}"
+
+
+def throttled_body(e):
+    return {"error": f"Too many report requests ({e.reason}), retry later", "reason": e.reason,
+            "retry_after": e.retry_after}
+
+
+def job_info(job_id):
+    job = report_queue.get(job_id)
+    info = job.to_dict() if job is not None else {"job_id": job_id, "status": "expired"}
+    info["status_url"] = f"/reports/{job_id}"
+    return info
+
+
 @app.route("/create_report", methods=["POST"])
 def create_report():
+    with stage("request"), sampled_profile(f"create_report_{request.args.get('mode', 'sync')}",
+                                           config.PROFILE_SAMPLE_RATE, config.PROFILE_SLOW_SECONDS,
+                                           config.PROFILE_DIR):
+        return _create_report()
+
+
+def _create_report():
     try:
         # Expect JSON data instead of files
-        data = request.get_json()
+        data = parse_body(request.get_data(cache=False))
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
 
-        # Extract variables from JSON
-        transcript = data.get("transcript")
-        audio = data.get("audio")
-        video = data.get("video")
-        score = data.get("score")
-        qualitative = data.get("qualitative")
-        presentation_mode = data.get("presentation_mode")
-        user_name = data.get("user_name")
-        LLM = data.get("LLM")
-
-        if not all([transcript, audio, video, score, qualitative, user_name, LLM]):
-            return jsonify({"error": "Missing required fields"}), 400
-
-        # Create user-specific reports directory
-        user_reports_dir = os.path.join(REPORTS_DIR, user_name)
-        os.makedirs(user_reports_dir, exist_ok=True)
-
-        # Save JSON data to files
-        output_data = json.loads(video)
-        output_data.update({"LLM": json.loads(LLM), "User Name": user_name})
-        output_json_path = os.path.join("json", f"{user_name}_output.json")
-        quality_json_path = os.path.join("json", f"{user_name}_quality.json")
-        scores_json_path = os.path.join("json", f"{user_name}_scores.json")
-        presentation_json_path = os.path.join("json", f"{user_name}_presentation.json")
-
-        os.makedirs("json", exist_ok=True)
-        with open(output_json_path, "w") as f:
-            json.dump(output_data, f, indent=4)
-        with open(quality_json_path, "w") as f:
-            json.dump(json.loads(qualitative), f, indent=4)
-        with open(scores_json_path, "w") as f:
-            json.dump(json.loads(score), f, indent=4)
-        with open(presentation_json_path, "w") as f:
-            json.dump({"presentation_mode": presentation_mode}, f, indent=4)
-
-        # Generate PDF
-        output_pdf_path = os.path.join(user_reports_dir, "combined_report.pdf")
-        create_combined_pdf("logos/logo.png", output_json_path, output_pdf_path)
-
-        # Send the PDF file
-        return send_file(output_pdf_path, as_attachment=True, download_name="combined_report.pdf", mimetype="application/pdf")
+        try:
+            with stage("parse"):
+                report_request = parse_report_request(data)
+                output_format = parse_output_format(request.args.get("format") or data.get("format"))
+        except PayloadError as e:
+            return jsonify({"error": str(e)}), 400
+
+        job_mode = request.args.get("mode") == "job"
+        if job_mode and output_format != "pdf":
+            return jsonify({"error": "Job mode only produces PDF reports"}), 400
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if idempotency_key is not None and not valid_idempotency_key(idempotency_key):
+            return jsonify({"error": "Invalid Idempotency-Key header"}), 400
+        tenant = request_tenant(request.headers.get("X-Tenant-ID"), report_request.cohort, request.remote_addr)
+        if tenant is None:
+            return jsonify({"error": "X-Tenant-ID must be 1-64 letters, digits, '-' or '_'"}), 400
+
+        candidate, cache_fields = prepare_report(report_request)
+
+        # The ETag is derived from the payload, so a client holding it already has this report
+        payload_key = canonical_cache_key(cache_fields)
+        cache_key = payload_key if report_cache is not None else None
+        etag = document_etag(cache_key, output_format)
+        if etag is not None and request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        # Job mode queues the render and returns a job id right away
+        try:
+            (kind, value, _), replayed = idempotent_report_outcome(
+                idempotency_key, report_request, candidate, output_format, job_mode, cache_key, payload_key, tenant)
+        except IdempotencyMismatch:
+            return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+        except Throttled as e:
+            response = jsonify(throttled_body(e))
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response, 429
+        except QueueFull:
+            response = jsonify({"error": "Report queue is full, retry later"})
+            response.headers["Retry-After"] = str(config.JOB_RETRY_AFTER)
+            return response, 429
+
+        if kind == "document":
+            response = document_response(value, output_format, etag)
+        elif kind == "job":
+            response = jsonify(job_info(value))
+            response.status_code = 202
+        else:
+            # Send the PDF from memory
+            pdf_bytes, rendered_size = value
+            response = pdf_response(pdf_bytes, etag=cache_key, rendered_size=rendered_size)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return response
 
     except Exception as e:
+        ERRORS.inc(endpoint="create_report")
         return jsonify({"error": f"Failed to create report: {str(e)}"}), 500
 
+
+class _ChunkWriter:
+    # Write-only sink that lets a ZipFile be streamed out chunk by chunk
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def _stream_batch_zip(candidates, errors, tenants, report_requests):
+    from PDF_Generator_final import create_combined_pdf_batch
+    executor = render_pool.get_pool(config.RENDER_PROCESSES) if config.RENDER_PROCESSES > 0 else None
+    writer = _ChunkWriter()
+    manifest = list(errors)
+    # PDFs are already compressed, so store them as-is
+    with zipfile.ZipFile(writer, "w", zipfile.ZIP_STORED) as archive:
+        indexes = [index for index, _ in candidates]
+        # Each report takes a bulk scheduler slot, so a large batch gets its fair
+        # share of the render slots instead of all of them
+        slots = [render_slot(tenant, BULK) for tenant in tenants] if scheduler is not None else None
+        results = create_combined_pdf_batch("logos/logo.png", [candidate for _, candidate in candidates],
+                                            executor=executor, workers=config.BATCH_WORKERS,
+                                            profile=config.PDF_PROFILE, slots=slots)
+        for result in results:
+            index = indexes[result["index"]]
+            if "pdf" in result:
+                record_cohort_member(report_requests[result["index"]])
+                filename = f"{index + 1:04d}_{secure_filename(result['name']) or 'candidate'}.pdf"
+                archive.writestr(filename, result["pdf"])
+                manifest.append({"index": index, "name": result["name"], "file": filename})
+            else:
+                ERRORS.inc(endpoint="create_reports_batch")
+                manifest.append({"index": index, "name": result["name"], "error": result["error"]})
+            yield from writer.drain()
+        manifest.sort(key=lambda item: item["index"])
+        archive.writestr("manifest.json", json.dumps(manifest, indent=4))
+    yield from writer.drain()
+
+
+@app.route("/create_reports/batch", methods=["POST"])
+def create_reports_batch():
+    data = parse_body(request.get_data(cache=False))
+    if not isinstance(data, dict) or not isinstance(data.get("candidates"), list) or not data["candidates"]:
+        return jsonify({"error": "Expected a non-empty 'candidates' list"}), 400
+    output_format = data.get("format", "zip")
+    if output_format not in ("zip", "pdf"):
+        return jsonify({"error": "format must be 'zip' or 'pdf'"}), 400
+
+    tenant_id = request.headers.get("X-Tenant-ID")
+    if request_tenant(tenant_id, None, request.remote_addr) is None:
+        return jsonify({"error": "X-Tenant-ID must be 1-64 letters, digits, '-' or '_'"}), 400
+
+    # Bad payloads are reported per item instead of failing the whole batch
+    candidates = []
+    tenants = []
+    report_requests = []
+    errors = []
+    for index, payload in enumerate(data["candidates"]):
+        try:
+            report_request = parse_report_request(payload)
+            candidate = prepare_report(report_request)[0]
+            candidates.append((index, with_speech_metrics(candidate, report_request.transcript)))
+            tenants.append(request_tenant(tenant_id, report_request.cohort, request.remote_addr))
+            report_requests.append(report_request)
+        except Exception as e:
+            name = payload.get("user_name") if isinstance(payload, dict) else None
+            errors.append({"index": index, "name": name, "error": str(e)})
+
+    if output_format == "pdf":
+        from PDF_Generator_final import create_combined_pdf_merged
+        try:
+            # One document, so one bulk slot for the whole render
+            with render_slot(request_tenant(tenant_id, None, request.remote_addr), BULK):
+                pdf_buffer, render_errors = create_combined_pdf_merged("logos/logo.png",
+                                                                       [candidate for _, candidate in candidates],
+                                                                       profile=config.PDF_PROFILE)
+        except Throttled as e:
+            response = jsonify(throttled_body(e))
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response, 429
+        except Exception as e:
+            ERRORS.inc(endpoint="create_reports_batch")
+            return jsonify({"error": f"Failed to create reports: {str(e)}"}), 500
+        # Candidates join their cohorts once their report is in the document
+        skipped = {error["index"] for error in render_errors}
+        for position, report_request in enumerate(report_requests):
+            if position not in skipped:
+                record_cohort_member(report_request)
+        for error in render_errors:
+            error["index"] = candidates[error["index"]][0]
+        response = send_file(pdf_buffer, as_attachment=True, download_name="combined_reports.pdf",
+                             mimetype="application/pdf")
+        response.headers["X-Report-Errors"] = json.dumps(sorted(errors + render_errors, key=lambda e: e["index"]))
+        return response
+
+    return Response(stream_with_context(_stream_batch_zip(candidates, errors, tenants, report_requests)), mimetype="application/zip",
+                    headers={"Content-Disposition": "attachment; filename=combined_reports.zip"})
+
+
+@app.route("/cohort/<cohort_id>/summary", methods=["GET"])
+def cohort_summary(cohort_id):
+    if not valid_cohort_id(cohort_id):
+        return jsonify({"error": "Invalid cohort id"}), 400
+    summary = get_cohort_store().summary(cohort_id)
+    if not summary["size"]:
+        return jsonify({"error": "Unknown cohort"}), 404
+    return jsonify(summary)
+
+
+@app.route("/candidates/<path:user_name>/reports", methods=["GET"])
+def list_stored_reports(user_name):
+    versions = get_report_store().versions(user_name)
+    if not versions:
+        return jsonify({"error": "No stored reports for this candidate"}), 404
+    return jsonify({"user_name": user_name, "versions": versions})
+
+
+@app.route("/candidates/<path:user_name>/reports/latest", methods=["GET"])
+@app.route("/candidates/<path:user_name>/reports/<int:version>", methods=["GET"])
+def get_stored_report(user_name, version=None):
+    stored = get_report_store().load(user_name, version)
+    if stored is None:
+        return jsonify({"error": "Unknown candidate or report version"}), 404
+    entry, pdf_bytes = stored
+    response = send_file(BytesIO(pdf_bytes), as_attachment=True, mimetype="application/pdf",
+                         download_name=f"{secure_filename(user_name) or 'report'}_v{entry['version']}.pdf")
+    response.set_etag(entry["sha256"])
+    response.headers["X-Report-Version"] = str(entry["version"])
+    return response
+
+
+@app.route("/reports/<job_id>", methods=["GET"])
+def get_report_job(job_id):
+    job = report_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id"}), 404
+    if job.status == DONE:
+        return pdf_response(job.result)
+    if job.status == FAILED:
+        return jsonify(job.to_dict()), 500
+    return jsonify(job.to_dict()), 202
+
+
+# Stand-in candidate rendered once during warm-up
+WARMUP_CANDIDATE = {
+    "tabular_data": {"posture": 3, "Eye Contact": 3, "Smile Score": 5, "Energetic Start": 4,
+                     "LLM": "These are the Answers:\n1. Warm-up answer.\n2. Warm-up answer.",
+                     "User Name": "Warm-up Candidate"},
+    "scores_data": {"question1": "Good", "presence": 4, "structure": 4, "confidence": 5, "articulation": 3},
+    "quality_data": {"Qualitative Analysis": ["Warm-up"], "Quantitative Analysis": ["Warm-up"]},
+}
+
+warmup_done = threading.Event()
+warmup_error = None
+
+
+def prewarm_charts():
+    # Fill the score chart cache with every common combination; runs on its own
+    # thread because it takes a while and readiness does not depend on it
+    try:
+        from plot_generator import prewarm_score_charts
+        start = time.perf_counter()
+        rendered = prewarm_score_charts()
+        print(f"Pre-warmed {rendered} score charts in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"Score chart pre-warm failed: {e}")
+
+
+def warm_up():
+    # Import the generator, load fonts and the logo, and render one throwaway
+    # report so the first real request does not pay for any of it. Under
+    # gunicorn this can also be called from a post_worker_init hook.
+    global warmup_error
+    if config.CHART_PREWARM and config.CHART_BACKEND == "matplotlib" and config.CHART_CACHE_MAX_BYTES > 0:
+        threading.Thread(target=prewarm_charts, name="chart-prewarm", daemon=True).start()
+    try:
+        from PDF_Generator_final import create_combined_pdf_buffer
+        for presentation_mode in ("off", "on"):
+            create_combined_pdf_buffer("logos/logo.png", presentation_mode=presentation_mode,
+                                       profile=config.PDF_PROFILE, **WARMUP_CANDIDATE)
+        if config.RENDER_PROCESSES > 0:
+            render_pool.warm_up(config.RENDER_PROCESSES)
+    except Exception as e:
+        warmup_error = str(e)
+        print(f"Warm-up failed: {e}")
+    finally:
+        warmup_done.set()
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    if not warmup_done.is_set():
+        return jsonify({"status": "warming_up"}), 503
+    info = {"status": "ready"}
+    if warmup_error is not None:
+        info["warmup_error"] = warmup_error
+    return jsonify(info), 200
+
+
+@app.route("/scheduler/stats", methods=["GET"])
+def scheduler_stats():
+    if scheduler is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify(dict(scheduler.stats(), enabled=True)), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+if multiprocessing.current_process().name != "MainProcess":
+    # Imported as __mp_main__ inside a render pool worker; nothing to warm here
+    warmup_done.set()
+elif config.WARMUP == "sync":
+    warm_up()
+elif config.WARMUP == "background":
+    threading.Thread(target=warm_up, name="report-warmup", daemon=True).start()
+else:
+    # No warm-up: heavy modules load on the first request
+    warmup_done.set()
+
 if __name__ == "__main__":
-    app.run(port=8004, host="0.0.0.0", debug=False)
\ No newline at end of file
+    app.run(port=8004, host="0.0.0.0", debug=False)
@@ -0,0 +1,307 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.utils import secure_filename
+
+import app as report_app
+import config
+from report_cache import canonical_cache_key
+from report_ingest import PayloadError, parse_body, parse_output_format, parse_report_request, valid_cohort_id
+from report_jobs import DONE, FAILED, QueueFull
+from report_metrics import ERRORS, render_prometheus, stage
+from render_scheduler import INTERACTIVE, Throttled
+from request_coalescing import IdempotencyMismatch, valid_idempotency_key
+
+# asyncio/ASGI front end with the same contract as app.py for single reports,
+# jobs, stored reports, cohort summaries and the health, metrics and scheduler
+# endpoints; /create_reports/batch is only served by app.py. Request
+# bodies are read and PDFs streamed on the event loop, and only rendering runs
+# on worker threads, so slow clients do not each hold a thread. Serve it with
+# any ASGI server, e.g.: uvicorn asgi_app:application --port 8004
+
+CHUNK_SIZE = 64 * 1024
+
+render_executor = ThreadPoolExecutor(max_workers=config.ASGI_RENDER_THREADS, thread_name_prefix="asgi-render")
+# Payload preparation (chart data, cohort standing) runs on its own threads, so
+# it does not queue behind renders
+prepare_executor = ThreadPoolExecutor(max_workers=config.ASGI_PREPARE_THREADS, thread_name_prefix="asgi-prepare")
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+async def read_body(receive, limit):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ConnectionResetError("Client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            raise BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _headers(scope):
+    return {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+
+async def send_response(send, status, body=b"", content_type=None, headers=None):
+    raw_headers = [(b"content-length", str(len(body)).encode())]
+    if content_type:
+        raw_headers.append((b"content-type", content_type.encode()))
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode("latin-1"), str(value).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    # Send large bodies in chunks so the loop can serve other connections in between
+    for offset in range(0, max(len(body), 1), CHUNK_SIZE):
+        chunk = body[offset:offset + CHUNK_SIZE]
+        await send({"type": "http.response.body", "body": chunk,
+                    "more_body": offset + CHUNK_SIZE < len(body)})
+
+
+async def send_json(send, status, payload, headers=None):
+    await send_response(send, status, json.dumps(payload).encode(), "application/json", headers)
+
+
+async def send_pdf(send, pdf_bytes, etag=None, download_name="combined_report.pdf", rendered_size=None,
+                   extra_headers=None):
+    headers = {"Content-Disposition": f"attachment; filename={download_name}"}
+    headers.update(report_app.pdf_size_headers(pdf_bytes, rendered_size))
+    if etag is not None:
+        headers["ETag"] = f'"{etag}"'
+        headers["Cache-Control"] = f"private, max-age={config.CACHE_TTL}"
+    headers.update(extra_headers or {})
+    await send_response(send, 200, pdf_bytes, "application/pdf", headers)
+
+
+async def send_document(send, body, output_format, etag=None, extra_headers=None):
+    from report_formats import MIMETYPES
+    headers = {}
+    if etag is not None:
+        headers["ETag"] = f'"{etag}"'
+        headers["Cache-Control"] = f"private, max-age={config.CACHE_TTL}"
+    headers.update(extra_headers or {})
+    await send_response(send, 200, body, MIMETYPES[output_format], headers)
+
+
+def _etag_matches(if_none_match, etag):
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or f'"{etag}"' in tags or f'W/"{etag}"' in tags
+
+
+async def create_report(scope, receive, send):
+    loop = asyncio.get_running_loop()
+    try:
+        body = await read_body(receive, config.ASGI_MAX_BODY_BYTES)
+    except BodyTooLarge:
+        await send_json(send, 413, {"error": "Request body too large"})
+        return
+    except ConnectionResetError:
+        # The client went away before sending the whole body; nobody to answer
+        return
+    data = parse_body(body)
+    if not data:
+        await send_json(send, 400, {"error": "No JSON data provided"})
+        return
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    try:
+        try:
+            with stage("parse"):
+                report_request = parse_report_request(data)
+                output_format = parse_output_format(query.get("format", [None])[0] or data.get("format"))
+        except PayloadError as e:
+            await send_json(send, 400, {"error": str(e)})
+            return
+        job_mode = query.get("mode") == ["job"]
+        if job_mode and output_format != "pdf":
+            await send_json(send, 400, {"error": "Job mode only produces PDF reports"})
+            return
+        headers = _headers(scope)
+        idempotency_key = headers.get("idempotency-key")
+        if idempotency_key is not None and not valid_idempotency_key(idempotency_key):
+            await send_json(send, 400, {"error": "Invalid Idempotency-Key header"})
+            return
+        client = scope.get("client")
+        tenant = report_app.request_tenant(headers.get("x-tenant-id"), report_request.cohort,
+                                           client and client[0])
+        if tenant is None:
+            await send_json(send, 400, {"error": "X-Tenant-ID must be 1-64 letters, digits, '-' or '_'"})
+            return
+
+        candidate, cache_fields = await loop.run_in_executor(prepare_executor, report_app.prepare_report,
+                                                             report_request)
+        payload_key = canonical_cache_key(cache_fields)
+        cache_key = payload_key if report_app.report_cache is not None else None
+        etag = report_app.document_etag(cache_key, output_format)
+        if etag is not None and _etag_matches(headers.get("if-none-match", ""), etag):
+            await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", f'"{etag}"'.encode())]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        try:
+            outcome_args = (idempotency_key, report_request, candidate, output_format, job_mode, cache_key,
+                            payload_key, tenant)
+            if report_app.scheduler is None or output_format != "pdf" or job_mode:
+                (kind, value, _), replayed = await loop.run_in_executor(
+                    render_executor, report_app.idempotent_report_outcome, *outcome_args)
+            else:
+                # Renders wait for their slot here on the event loop and only
+                # then go to the executor, so they start in the scheduler's fair
+                # order rather than the executor's FIFO. As in app.py, only an
+                # actual render holds a slot: replays, cached reports and
+                # requests joining an identical render in flight do not.
+                outcome = await loop.run_in_executor(prepare_executor, report_app.idempotent_replay,
+                                                     idempotency_key, report_request, output_format, job_mode)
+                replayed = outcome is not None
+                if not replayed:
+                    report_app.scheduler.admit(tenant, INTERACTIVE)
+                    if await loop.run_in_executor(prepare_executor, report_app.render_needed, cache_key,
+                                                  payload_key):
+                        async with report_app.scheduler.async_slot(tenant, INTERACTIVE):
+                            # An identical request may have rendered it meanwhile
+                            if await loop.run_in_executor(prepare_executor, report_app.render_needed, cache_key,
+                                                          payload_key):
+                                outcome, replayed = await loop.run_in_executor(
+                                    render_executor, report_app.idempotent_report_outcome, *outcome_args[:-1],
+                                    None, True)
+                    if outcome is None:
+                        outcome, replayed = await loop.run_in_executor(
+                            render_executor, report_app.idempotent_report_outcome, *outcome_args, True)
+                kind, value, _ = outcome
+        except IdempotencyMismatch:
+            await send_json(send, 422, {"error": "Idempotency-Key was already used for a different request"})
+            return
+        except Throttled as e:
+            await send_json(send, 429, report_app.throttled_body(e), {"Retry-After": e.retry_after})
+            return
+        except QueueFull:
+            await send_json(send, 429, {"error": "Report queue is full, retry later"},
+                            {"Retry-After": config.JOB_RETRY_AFTER})
+            return
+    except Exception as e:
+        ERRORS.inc(endpoint="create_report")
+        await send_json(send, 500, {"error": f"Failed to create report: {str(e)}"})
+        return
+    replay_headers = {"Idempotent-Replayed": "true"} if replayed else None
+    if kind == "document":
+        await send_document(send, value, output_format, etag, replay_headers)
+    elif kind == "job":
+        await send_json(send, 202, report_app.job_info(value), replay_headers)
+    else:
+        pdf_bytes, rendered_size = value
+        await send_pdf(send, pdf_bytes, etag=cache_key, rendered_size=rendered_size, extra_headers=replay_headers)
+
+
+async def get_report_job(send, job_id):
+    job = report_app.report_queue.get(job_id)
+    if job is None:
+        await send_json(send, 404, {"error": "Unknown or expired job id"})
+    elif job.status == DONE:
+        await send_pdf(send, job.result)
+    elif job.status == FAILED:
+        await send_json(send, 500, job.to_dict())
+    else:
+        await send_json(send, 202, job.to_dict())
+
+
+async def stored_reports(send, path):
+    # /candidates/<user_name>/reports[/latest|/<version>]; user names may contain "/"
+    rest = path[len("/candidates/"):]
+    loop = asyncio.get_running_loop()
+    store = report_app.get_report_store()
+    if rest.endswith("/reports") and len(rest) > len("/reports"):
+        user_name = rest[:-len("/reports")]
+        versions = await loop.run_in_executor(render_executor, store.versions, user_name)
+        if not versions:
+            await send_json(send, 404, {"error": "No stored reports for this candidate"})
+        else:
+            await send_json(send, 200, {"user_name": user_name, "versions": versions})
+        return
+    user_name, _, selector = rest.rpartition("/")
+    if not user_name.endswith("/reports") or len(user_name) == len("/reports") or \
+            not (selector == "latest" or selector.isdigit()):
+        await send_json(send, 404, {"error": "Not found"})
+        return
+    user_name = user_name[:-len("/reports")]
+    version = None if selector == "latest" else int(selector)
+    stored = await loop.run_in_executor(render_executor, store.load, user_name, version)
+    if stored is None:
+        await send_json(send, 404, {"error": "Unknown candidate or report version"})
+        return
+    entry, pdf_bytes = stored
+    filename = f"{secure_filename(user_name) or 'report'}_v{entry['version']}.pdf"
+    headers = {"Content-Disposition": f"attachment; filename={filename}",
+               "ETag": f'"{entry["sha256"]}"', "X-Report-Version": entry["version"]}
+    await send_response(send, 200, pdf_bytes, "application/pdf", headers)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Hold startup until warm-up is done so the server only accepts traffic once ready
+            await asyncio.get_running_loop().run_in_executor(None, report_app.warmup_done.wait)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            render_executor.shutdown(wait=False)
+            prepare_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    path = scope["path"]
+    method = scope["method"]
+    if path == "/create_report":
+        if method != "POST":
+            await send_json(send, 405, {"error": "Method not allowed"}, {"Allow": "POST"})
+            return
+        with stage("request"):
+            await create_report(scope, receive, send)
+    elif path.startswith("/candidates/") and method == "GET":
+        await stored_reports(send, path)
+    elif path.startswith("/reports/") and method == "GET":
+        await get_report_job(send, path[len("/reports/"):])
+    elif path.startswith("/cohort/") and path.endswith("/summary") and method == "GET":
+        cohort_id = path[len("/cohort/"):-len("/summary")]
+        if not valid_cohort_id(cohort_id):
+            await send_json(send, 400, {"error": "Invalid cohort id"})
+            return
+        summary = await asyncio.get_running_loop().run_in_executor(render_executor,
+                                                                   report_app.get_cohort_store().summary,
+                                                                   cohort_id)
+        if not summary["size"]:
+            await send_json(send, 404, {"error": "Unknown cohort"})
+        else:
+            await send_json(send, 200, summary)
+    elif path == "/healthz" and method == "GET":
+        if not report_app.warmup_done.is_set():
+            await send_json(send, 503, {"status": "warming_up"})
+        else:
+            info = {"status": "ready"}
+            if report_app.warmup_error is not None:
+                info["warmup_error"] = report_app.warmup_error
+            await send_json(send, 200, info)
+    elif path == "/scheduler/stats" and method == "GET":
+        scheduler = report_app.scheduler
+        await send_json(send, 200, dict(scheduler.stats(), enabled=True) if scheduler is not None
+                        else {"enabled": False})
+    elif path == "/metrics" and method == "GET":
+        await send_response(send, 200, render_prometheus().encode(), "text/plain; version=0.0.4")
+    else:
+        await send_json(send, 404, {"error": "Not found"})
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from io import BytesIO
+
+# Benchmark for the report pipeline: per-stage timings of the generator and
+# end-to-end /create_report latency and throughput through the Flask test client.
+# Run from the repository root: python benchmarks/bench_reports.py
+# Results are written as JSON so runs can be compared across changes.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# Measure rendering, not the cache, the background reports/ writer or the
+# scheduler's per-client rate limit
+os.environ.setdefault("REPORT_CACHE_MAX_BYTES", "0")
+os.environ.setdefault("REPORT_PERSIST", "off")
+os.environ.setdefault("REPORT_SCHEDULER_SLOTS", "0")
+
+SHORT_ANSWER = "The speaker was clear and confident."
+LONG_ANSWER = ("The candidate highlighted relevant academic achievements, software skills, and research awards, "
+               "demonstrating a solid understanding of the topic. However, there were no external citations or "
+               "industry benchmarks referenced. ") * 6
+RATINGS = ["Excellent", "Good", "Satisfactory", "Needs Improvement", "Poor"]
+
+
+def make_payload(name, presentation_mode="off", answer=SHORT_ANSWER, bullets=4, questions=12, segments=50):
+    llm = "These are the Answers:\n" + "\n".join(f"{i}. {answer}" for i in range(1, questions + 1))
+    scores = {f"question{i}": RATINGS[i % len(RATINGS)] for i in range(1, questions + 1)}
+    scores.update({"presence": 4, "structure": 4, "confidence": 5, "articulation": 3})
+    video = {"posture": 3, "Eye Contact": 3, "Smile Score": 5, "Energetic Start": 4}
+    quality = {
+        "Qualitative Analysis": [f"Positive observation {i}: {SHORT_ANSWER}" for i in range(bullets)],
+        "Quantitative Analysis": [f"Area of improvement {i}: {SHORT_ANSWER}" for i in range(bullets)],
+    }
+    transcript = [{"start": i * 5, "end": i * 5 + 4, "text": " Some words spoken in this segment."}
+                  for i in range(segments)]
+    return {
+        "transcript": json.dumps(transcript),
+        "audio": "audio.wav",
+        "video": json.dumps(video),
+        "score": json.dumps(scores),
+        "qualitative": json.dumps(quality),
+        "presentation_mode": presentation_mode,
+        "user_name": name,
+        "LLM": json.dumps(llm),
+    }
+
+
+SCENARIOS = {
+    "short_interview": lambda: make_payload("bench_short_interview"),
+    "short_presentation": lambda: make_payload("bench_short_presentation", presentation_mode="on"),
+    "long_answers": lambda: make_payload("bench_long_answers", answer=LONG_ANSWER),
+    "many_bullets": lambda: make_payload("bench_many_bullets", bullets=40),
+    "long_everything": lambda: make_payload("bench_long_everything", presentation_mode="on",
+                                            answer=LONG_ANSWER, bullets=40, segments=2000),
+}
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(50) * 1000,
+        "p95_ms": pick(95) * 1000,
+        "p99_ms": pick(99) * 1000,
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_stages(payload, iterations):
+    from reportlab.lib.units import inch
+    import app
+    from PDF_Generator_final import combined_report_flowables, report_doc
+    from plot_generator import score_chart_flowable
+    from report_template import get_report_template
+
+    stages = {"parse": [], "chart": [], "flowables": [], "layout": [], "write": []}
+    pdf_size = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            candidate = app.parse_report_payload(payload)
+            stages["parse"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            score_chart_flowable(candidate["scores_data"], width=6*inch, height=3*inch)
+            stages["chart"].append(time.perf_counter() - start)
+
+            template = get_report_template(candidate["presentation_mode"], "logos/logo.png")
+            start = time.perf_counter()
+            flowables = combined_report_flowables(candidate["tabular_data"], candidate["scores_data"],
+                                                  candidate["quality_data"], template=template)
+            stages["flowables"].append(time.perf_counter() - start)
+
+            buffer = BytesIO()
+            start = time.perf_counter()
+            report_doc(buffer).build(flowables, onFirstPage=template.header_footer,
+                                     onLaterPages=template.header_footer)
+            stages["layout"].append(time.perf_counter() - start)
+            pdf_bytes = buffer.getvalue()
+            pdf_size = len(pdf_bytes)
+
+            start = time.perf_counter()
+            with open(os.path.join(tmp_dir, "combined_report.pdf"), "wb") as f:
+                f.write(pdf_bytes)
+            stages["write"].append(time.perf_counter() - start)
+    return {"pdf_bytes": pdf_size, "stages": {name: percentiles(samples) for name, samples in stages.items()}}
+
+
+def bench_endpoint(payload, iterations, concurrency):
+    import app
+    client_lock = threading.Lock()
+    latencies = []
+    sizes = []
+    errors = 0
+
+    def client(number, count):
+        nonlocal errors
+        test_client = app.app.test_client()
+        for i in range(count):
+            # Distinct candidates, so concurrent requests are not coalesced into one render
+            request_payload = dict(payload, user_name=f"{payload['user_name']}_{number}_{i}")
+            start = time.perf_counter()
+            response = test_client.post("/create_report", json=request_payload)
+            elapsed = time.perf_counter() - start
+            with client_lock:
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+                    sizes.append(len(response.data))
+                else:
+                    errors += 1
+
+    per_client = max(1, iterations // concurrency)
+    threads = [threading.Thread(target=client, args=(number, per_client)) for number in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    result = {"concurrency": concurrency, "requests": per_client * concurrency, "errors": errors,
+              "reports_per_sec": len(latencies) / wall if wall else 0.0}
+    if latencies:
+        result.update(percentiles(latencies))
+        result["pdf_bytes"] = max(sizes)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark report generation")
+    parser.add_argument("--iterations", type=int, default=20, help="reports per scenario and measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="concurrent clients to test")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    import config
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "chart_backend": config.CHART_BACKEND,
+        "render_processes": config.RENDER_PROCESSES,
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        payload = SCENARIOS[name]()
+        # One warm-up render so imports and first-use costs are not in the numbers
+        bench_stages(payload, 1)
+        scenario = {"pipeline": bench_stages(payload, args.iterations), "endpoint": []}
+        for concurrency in args.concurrency:
+            scenario["endpoint"].append(bench_endpoint(payload, args.iterations, concurrency))
+        results["scenarios"][name] = scenario
+
+        stages = scenario["pipeline"]["stages"]
+        print(f"{name}: {scenario['pipeline']['pdf_bytes']} bytes, "
+              + ", ".join(f"{stage} {timing['p50_ms']:.2f}ms" for stage, timing in stages.items()))
+        for run in scenario["endpoint"]:
+            print(f"  {run['concurrency']:>3} clients: p50 {run.get('p50_ms', 0):.1f}ms "
+                  f"p95 {run.get('p95_ms', 0):.1f}ms p99 {run.get('p99_ms', 0):.1f}ms "
+                  f"{run['reports_per_sec']:.1f} reports/s")
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"peak RSS: {results['peak_rss_mb']:.1f} MB")
+
+    output = args.output
+    if output is None:
+        os.makedirs(os.path.join(ROOT, "benchmarks", "results"), exist_ok=True)
+        output = os.path.join(ROOT, "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
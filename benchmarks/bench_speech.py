@@ -0,0 +1,45 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Benchmark for the speech-delivery metrics: time to analyze a synthetic
+# transcript with irregular segment lengths, pauses and filler words.
+# Run from the repository root: python benchmarks/bench_speech.py --segments 10000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from speech_metrics import analyze_transcript
+
+WORDS = ("so", "the", "project", "um", "was", "you know", "really", "about", "uh", "learning", "how", "to", "lead")
+
+
+def make_transcript(segments, seed=0):
+    rng = random.Random(seed)
+    transcript = []
+    start = 0.0
+    for _ in range(segments):
+        duration = rng.uniform(1.5, 8.0)
+        text = " ".join(rng.choice(WORDS) for _ in range(int(duration * rng.uniform(1.5, 3.0))))
+        transcript.append({"start": round(start, 2), "end": round(start + duration, 2), "text": text.capitalize() + "."})
+        start += duration + rng.choice((0.0, 0.2, 0.5, 1.5, 3.0))
+    return transcript
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    transcript = make_transcript(args.segments)
+    analyze_transcript(transcript)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        metrics = analyze_transcript(transcript)
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(f"{args.segments} segments: {elapsed * 1000:.1f} ms per analysis")
+    for key, value in metrics.items():
+        print(f"{key:>22}: {value}")
@@ -0,0 +1,26 @@
+import os
+import sys
+import timeit
+
+# Microbenchmark for the per-report setup that ReportTemplate removes: the old
+# path rebuilt the stylesheet, paragraph styles and table style on every call.
+# Run from the repository root: python benchmarks/bench_template.py
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_template import ReportTemplate, get_report_template
+
+
+def per_report_setup():
+    return ReportTemplate("off")
+
+
+def registry_lookup():
+    return get_report_template("off")
+
+
+if __name__ == "__main__":
+    number = 2000
+    for label, func in (("rebuild per report", per_report_setup), ("registry lookup", registry_lookup)):
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{label:>20}: {seconds / number * 1e6:8.2f} us per report")
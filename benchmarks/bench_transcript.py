@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+# Benchmark for the transcript appendix on long recordings: render time, pages,
+# PDF size and peak Python memory for a synthetic transcript, with the appendix
+# streamed into the layout (as the generator does) and, for comparison, with all
+# appendix flowables built up front.
+# Run from the repository root: python benchmarks/bench_transcript.py --segments 10000
+# --memory adds a tracemalloc run per case (several times slower than the timed run).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from PDF_Generator_final import combined_report_flowables, report_doc
+from report_template import get_report_template
+from transcript_appendix import StreamedFlowables, transcript_flowables
+
+SENTENCE = " And that is how the next part of the project came together over the following weeks."
+
+
+def make_transcript(segments):
+    return [{"start": i * 4, "end": i * 4 + 4, "text": SENTENCE} for i in range(segments)]
+
+
+def make_report():
+    tabular_data = {"posture": 3, "Eye Contact": 3, "Smile Score": 5, "Energetic Start": 4,
+                    "LLM": "These are the Answers:\n" + "\n".join(f"{i}. Clear and confident." for i in range(1, 13)),
+                    "User Name": "bench_transcript"}
+    scores_data = {f"question{i}": "Good" for i in range(1, 11)}
+    scores_data.update({"presence": 4, "structure": 4, "confidence": 5, "articulation": 3})
+    quality_data = {"Qualitative Analysis": ["Good pacing."], "Quantitative Analysis": ["More pauses."]}
+    return tabular_data, scores_data, quality_data
+
+
+def render(transcript, max_segments, streamed):
+    template = get_report_template("off")
+    tabular_data, scores_data, quality_data = make_report()
+    buffer = BytesIO()
+    doc = report_doc(buffer)
+    flowables = combined_report_flowables(tabular_data, scores_data, quality_data, template=template)
+    appendix = transcript_flowables(transcript, template, max_segments=max_segments)
+    if streamed:
+        flowables = StreamedFlowables(flowables, appendix)
+    else:
+        flowables.extend(appendix)
+    doc.build(flowables, onFirstPage=template.header_footer, onLaterPages=template.header_footer)
+    return buffer.getvalue(), doc.page
+
+
+def measure(transcript, max_segments, streamed):
+    start = time.perf_counter()
+    pdf_bytes, pages = render(transcript, max_segments, streamed)
+    return time.perf_counter() - start, pages, len(pdf_bytes)
+
+
+def peak_memory(transcript, max_segments, streamed):
+    tracemalloc.start()
+    render(transcript, max_segments, streamed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--cap", type=int, default=1500, help="max_segments for the capped runs")
+    parser.add_argument("--memory", action="store_true", help="also report peak Python memory")
+    args = parser.parse_args()
+
+    transcript = make_transcript(args.segments)
+    # One untimed run so imports and font metrics are not charged to the first case
+    render(transcript[:10], 0, True)
+    print(f"{args.segments} segments")
+    for label, max_segments, streamed in (("streamed, no cap", 0, True),
+                                          ("materialized, no cap", 0, False),
+                                          (f"streamed, cap {args.cap}", args.cap, True)):
+        seconds, pages, size = measure(transcript, max_segments, streamed)
+        line = f"{label:>22}: {seconds:7.2f} s  {pages:4d} pages  {size / 1024:8.1f} KiB"
+        if args.memory:
+            line += f"  peak {peak_memory(transcript, max_segments, streamed) / 1024 / 1024:7.1f} MiB"
+        print(line)
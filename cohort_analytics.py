@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import numpy as np
+from report_template import SCORE_MAPPING
+
+# Cohort-level analytics over many candidates' scores and video metrics. Each
+# cohort is an append-only JSON lines file that is read once per process; the
+# candidates are then held as NumPy arrays so summaries and percentile ranks are
+# computed in a few vectorized operations instead of per-report Python loops.
+
+RATING_LEVELS = (1, 2, 3, 4, 5)
+
+
+def influence_quotients(rating_points, rating_counts):
+    # Same formula as the report: mapped rating points over 5 per score entry, out of 100
+    max_scores = rating_counts * 5
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quotients = np.where(max_scores > 0, rating_points.sum(axis=1) / max_scores * 100, 0.0)
+    # round() in the report rounds half to even, as does np.rint
+    return np.rint(quotients)
+
+
+def percentile_ranks(values, population):
+    # Share of the population below each value, counting ties as half
+    ordered = np.sort(population)
+    below = np.searchsorted(ordered, values, side="left")
+    at_or_below = np.searchsorted(ordered, values, side="right")
+    return (below + at_or_below) / 2 / max(len(ordered), 1) * 100
+
+
+def influence_quotient(scores):
+    # influence_quotients for a single candidate's scores
+    points = sum(SCORE_MAPPING[value] for value in scores.values() if value in SCORE_MAPPING)
+    max_score = len(scores) * 5
+    return float(np.rint(points / max_score * 100)) if max_score else 0.0
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Cohort:
+    # Members are rows of preallocated arrays that grow by doubling, so adding a
+    # candidate writes one row instead of rebuilding the arrays from every entry
+    def __init__(self, cohort_id):
+        self.cohort_id = cohort_id
+        self._members = {}  # user name -> (scores, video); a resubmission replaces the entry
+        self._rows = {}  # user name -> row in the arrays
+        self._names = []
+        self._parameters = []
+        self._columns = {}  # parameter -> column
+        self._values = np.full((0, 0), np.nan)
+        self._quotients = np.zeros(0)
+        self._sorted_quotients = None  # kept until the membership changes
+
+    def __len__(self):
+        return len(self._members)
+
+    def add(self, name, scores, video):
+        self._members[name] = (scores, video)
+        row = self._rows.get(name)
+        if row is None:
+            row = self._rows[name] = len(self._names)
+            self._names.append(name)
+        for key in list(scores) + list(video):
+            if key not in self._columns:
+                self._columns[key] = len(self._parameters)
+                self._parameters.append(key)
+        self._reserve(len(self._names), len(self._parameters))
+
+        # values: numeric value of every parameter (ratings mapped to 1-5), NaN when absent
+        values = self._values[row]
+        values[:] = np.nan
+        for key, value in scores.items():
+            if value in SCORE_MAPPING:
+                values[self._columns[key]] = SCORE_MAPPING[value]
+            elif _numeric(value):
+                values[self._columns[key]] = value
+        for key, value in video.items():
+            if _numeric(value):
+                values[self._columns[key]] = value
+        self._quotients[row] = influence_quotient(scores)
+        self._sorted_quotients = None
+
+    def _reserve(self, rows, columns):
+        capacity_rows, capacity_columns = self._values.shape
+        if rows <= capacity_rows and columns <= capacity_columns:
+            return
+        if rows > capacity_rows:
+            capacity_rows = max(rows, capacity_rows * 2, 16)
+        if columns > capacity_columns:
+            capacity_columns = max(columns, capacity_columns * 2, 8)
+        values = np.full((capacity_rows, capacity_columns), np.nan)
+        values[:self._values.shape[0], :self._values.shape[1]] = self._values
+        quotients = np.zeros(capacity_rows)
+        quotients[:len(self._quotients)] = self._quotients
+        self._values = values
+        self._quotients = quotients
+
+    def has(self, name, scores, video):
+        # True when name is a member with exactly this entry
+        return self._members.get(name) == (scores, video)
+
+    def standing_with(self, name, scores, video):
+        # (percentile, size) the candidate would have once recorded, without
+        # recording it: its quotient ranked against the cached sorted quotients,
+        # leaving out the entry it would replace
+        if self.has(name, scores, video):
+            return self.percentile_of(name), len(self)
+        quotient = influence_quotient(scores)
+        if self._sorted_quotients is None:
+            self._sorted_quotients = np.sort(self._quotients[:len(self._names)])
+        below = int(np.searchsorted(self._sorted_quotients, quotient, side="left"))
+        at_or_below = int(np.searchsorted(self._sorted_quotients, quotient, side="right")) + 1
+        size = len(self) + 1
+        row = self._rows.get(name)
+        if row is not None:
+            size -= 1
+            previous = self._quotients[row]
+            if previous < quotient:
+                below -= 1
+            if previous <= quotient:
+                at_or_below -= 1
+        return (below + at_or_below) / 2 / size * 100, size
+
+    def arrays(self):
+        # Views of the members' rows; valid until the next add
+        rows = len(self._names)
+        return {
+            "names": self._names,
+            "parameters": self._parameters,
+            "values": self._values[:rows, :len(self._parameters)],
+            "influence_quotients": self._quotients[:rows],
+        }
+
+    def percentile_of(self, name):
+        arrays = self.arrays()
+        quotients = arrays["influence_quotients"]
+        index = self._rows[name]
+        return float(percentile_ranks(quotients[index:index + 1], quotients)[0])
+
+    def summary(self):
+        arrays = self.arrays()
+        quotients = arrays["influence_quotients"]
+        values = arrays["values"]
+        result = {"cohort_id": self.cohort_id, "size": len(arrays["names"])}
+        if not len(quotients):
+            return result
+
+        p25, p50, p75 = np.percentile(quotients, [25, 50, 75])
+        histogram, edges = np.histogram(quotients, bins=10, range=(0, 100))
+        result["influence_quotient"] = {
+            "mean": float(quotients.mean()),
+            "std": float(quotients.std()),
+            "min": float(quotients.min()),
+            "p25": float(p25),
+            "median": float(p50),
+            "p75": float(p75),
+            "max": float(quotients.max()),
+            "histogram": {f"{int(lo)}-{int(hi)}": int(count)
+                          for lo, hi, count in zip(edges[:-1], edges[1:], histogram)},
+        }
+
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        with np.errstate(invalid="ignore"):
+            sums = np.where(present, values, 0).sum(axis=0)
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+            squares = np.where(present, (values - means) ** 2, 0).sum(axis=0)
+            stds = np.sqrt(np.where(counts > 0, squares / np.maximum(counts, 1), np.nan))
+        # Distribution over the 1-5 rating scale for every parameter in one pass
+        level_counts = np.stack([(values == level).sum(axis=0) for level in RATING_LEVELS], axis=1)
+
+        parameters = {}
+        for i, parameter in enumerate(arrays["parameters"]):
+            if not counts[i]:
+                continue
+            parameters[parameter] = {
+                "count": int(counts[i]),
+                "mean": float(means[i]),
+                "std": float(stds[i]),
+                "distribution": {str(level): int(n) for level, n in zip(RATING_LEVELS, level_counts[i])},
+            }
+        result["parameters"] = parameters
+        return result
+
+
+class CohortStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._cohorts = {}
+        self._lock = threading.Lock()
+
+    def _path(self, cohort_id):
+        return os.path.join(self.directory, f"{cohort_id}.jsonl")
+
+    def get(self, cohort_id):
+        # Loaded from disk once, then kept up to date in memory
+        with self._lock:
+            cohort = self._cohorts.get(cohort_id)
+            if cohort is None:
+                cohort = Cohort(cohort_id)
+                try:
+                    with open(self._path(cohort_id), "r") as f:
+                        for line in f:
+                            if line.strip():
+                                entry = json.loads(line)
+                                cohort.add(entry["name"], entry["scores"], entry["video"])
+                except FileNotFoundError:
+                    pass
+                self._cohorts[cohort_id] = cohort
+            return cohort
+
+    def add(self, cohort_id, name, scores, video):
+        # Appends the entry unless the member is already recorded with it, so
+        # resubmitting the same candidate does not grow the file
+        cohort = self.get(cohort_id)
+        with self._lock:
+            if cohort.has(name, scores, video):
+                return cohort
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(cohort_id), "a") as f:
+                f.write(json.dumps({"name": name, "scores": scores, "video": video}) + "\n")
+            cohort.add(name, scores, video)
+        return cohort
+
+    def percentile(self, cohort_id, name):
+        cohort = self.get(cohort_id)
+        with self._lock:
+            return cohort.percentile_of(name), len(cohort)
+
+    def standing(self, cohort_id, name, scores, video):
+        # (percentile, cohort size) as if the candidate were recorded; writes nothing
+        cohort = self.get(cohort_id)
+        with self._lock:
+            return cohort.standing_with(name, scores, video)
+
+    def summary(self, cohort_id):
+        cohort = self.get(cohort_id)
+        with self._lock:
+            return cohort.summary()
@@ -0,0 +1,116 @@
+import os
+
+# Runtime settings for the report server, overridable through the environment
+
+# Score chart backend: "vector" draws with reportlab.graphics, "matplotlib" embeds a PNG
+CHART_BACKEND = os.environ.get("REPORT_CHART_BACKEND", "vector").lower()
+
+# Background report jobs (POST /create_report?mode=job)
+JOB_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("REPORT_JOB_QUEUE_SIZE", "32"))
+JOB_RESULT_TTL = int(os.environ.get("REPORT_JOB_RESULT_TTL", "600"))
+JOB_RETRY_AFTER = int(os.environ.get("REPORT_JOB_RETRY_AFTER", "5"))
+
+# Worker processes used to render PDFs; 0 renders in the request/job thread
+RENDER_PROCESSES = int(os.environ.get("REPORT_RENDER_PROCESSES", "0"))
+
+# Threads used by /create_reports/batch when no render process pool is configured
+BATCH_WORKERS = int(os.environ.get("REPORT_BATCH_WORKERS", "4"))
+
+# Cache of finished PDFs keyed on the request payload; 0 bytes disables it
+CACHE_MAX_BYTES = int(os.environ.get("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL = int(os.environ.get("REPORT_CACHE_TTL", "3600"))
+# Optional on-disk tier for the cache, disabled when empty
+CACHE_DIR = os.environ.get("REPORT_CACHE_DIR", "")
+CACHE_DISK_MAX_BYTES = int(os.environ.get("REPORT_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Saving a copy under reports/<user_name>/: "async" (after the response), "sync" or "off"
+PERSIST_REPORTS = os.environ.get("REPORT_PERSIST", "async").lower()
+
+# Opt-in cProfile dumps: profile this fraction of /create_report requests and
+# keep the .prof file for those slower than PROFILE_SLOW_SECONDS
+PROFILE_SAMPLE_RATE = float(os.environ.get("REPORT_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_SECONDS = float(os.environ.get("REPORT_PROFILE_SLOW_SECONDS", "1.0"))
+PROFILE_DIR = os.environ.get("REPORT_PROFILE_DIR", "profiles")
+
+# Warm-up when the app is imported: "background" (default; /healthz reports 503
+# until done), "sync" (block import until done) or "off" (load on first request)
+WARMUP = os.environ.get("REPORT_WARMUP", "background").lower()
+
+# asgi_app.py: threads that run renders off the event loop, threads that prepare
+# payloads (chart data, cohort standing) before rendering, and the request body limit
+ASGI_RENDER_THREADS = int(os.environ.get("REPORT_ASGI_RENDER_THREADS", "4"))
+ASGI_PREPARE_THREADS = int(os.environ.get("REPORT_ASGI_PREPARE_THREADS", "4"))
+ASGI_MAX_BODY_BYTES = int(os.environ.get("REPORT_ASGI_MAX_BODY_BYTES", str(50 * 1024 * 1024)))
+
+# Directory holding one JSON lines file of candidate scores per cohort
+COHORT_DIR = os.environ.get("REPORT_COHORT_DIR", "cohorts")
+
+# Render reports as separately cached summary and metrics segments merged with
+# pypdf, so partial updates only re-lay-out what changed (needs pypdf)
+INCREMENTAL_RENDER = os.environ.get("REPORT_INCREMENTAL_RENDER", "0").lower() in ("1", "true", "yes", "on")
+SEGMENT_CACHE_MAX_BYTES = int(os.environ.get("REPORT_SEGMENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# PDF output profile: "standard", or "compact" for smaller files (images
+# downsampled to PDF_IMAGE_DPI, vector chart, and a pypdf pass that strips
+# ASCII85, recompresses streams and dedupes objects; see pdf_optimize.py)
+PDF_PROFILE = os.environ.get("REPORT_PDF_PROFILE", "standard").lower()
+PDF_IMAGE_DPI = int(os.environ.get("REPORT_PDF_IMAGE_DPI", "150"))
+PDF_JPEG_QUALITY = int(os.environ.get("REPORT_PDF_JPEG_QUALITY", "80"))
+
+# Versioned report storage (report_store.py); REPORT_STORE_DIR defaults to
+# reports/ next to app.py. Retention: versions older than REPORT_STORE_MAX_AGE
+# seconds, beyond REPORT_STORE_MAX_VERSIONS per candidate, or past
+# REPORT_STORE_MAX_BYTES in total are removed every REPORT_STORE_SWEEP_SECONDS
+# (0 disables a limit)
+STORE_DIR = os.environ.get("REPORT_STORE_DIR", "")
+STORE_MAX_BYTES = int(os.environ.get("REPORT_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+STORE_MAX_AGE = int(os.environ.get("REPORT_STORE_MAX_AGE", str(30 * 24 * 3600)))
+STORE_MAX_VERSIONS = int(os.environ.get("REPORT_STORE_MAX_VERSIONS", "10"))
+STORE_SWEEP_SECONDS = int(os.environ.get("REPORT_STORE_SWEEP_SECONDS", "600"))
+
+# Transcript appendix (requested with "transcript_appendix": true): segments
+# printed before the rest is summarized in one line, and characters kept per
+# segment (0 disables either cap)
+TRANSCRIPT_MAX_SEGMENTS = int(os.environ.get("REPORT_TRANSCRIPT_MAX_SEGMENTS", "1500"))
+TRANSCRIPT_MAX_CHARS = int(os.environ.get("REPORT_TRANSCRIPT_MAX_CHARS", "1000"))
+
+# Speech-delivery metrics (speaking rate, pace variation, pauses, filler words)
+# measured from the transcript's segment timings and added as a row of the
+# Detailed Evaluation Metrics table; see speech_metrics.py
+SPEECH_METRICS = os.environ.get("REPORT_SPEECH_METRICS", "1").lower() in ("1", "true", "yes", "on")
+
+# Cache of rendered matplotlib score charts (REPORT_CHART_BACKEND=matplotlib),
+# keyed on the plotted labels and values; 0 bytes disables it. The optional disk
+# tier is shared by render processes. With REPORT_CHART_PREWARM on, warm-up
+# renders every 1-5 score combination for REPORT_CHART_PREWARM_LABELS in the
+# background (625 charts for four labels)
+CHART_CACHE_MAX_BYTES = int(os.environ.get("REPORT_CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CHART_CACHE_DIR = os.environ.get("REPORT_CHART_CACHE_DIR", "")
+CHART_CACHE_DISK_MAX_BYTES = int(os.environ.get("REPORT_CHART_CACHE_DISK_MAX_BYTES", str(128 * 1024 * 1024)))
+CHART_PREWARM = os.environ.get("REPORT_CHART_PREWARM", "0").lower() in ("1", "true", "yes", "on")
+CHART_PREWARM_LABELS = [label.strip() for label in os.environ.get(
+    "REPORT_CHART_PREWARM_LABELS", "presence,structure,confidence,articulation").split(",") if label.strip()]
+
+# Outcomes of /create_report requests sent with an Idempotency-Key header are
+# kept this many seconds, so client retries get the same report (or job id)
+# instead of a new render; 0 disables Idempotency-Key handling
+IDEMPOTENCY_TTL = int(os.environ.get("REPORT_IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_MAX_BYTES = int(os.environ.get("REPORT_IDEMPOTENCY_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Fair render scheduler (render_scheduler.py): PDF renders wait for one of
+# REPORT_SCHEDULER_SLOTS slots (0 disables the scheduler), ordered by weighted
+# fair queuing across tenants, with interactive reports weighted over bulk (job
+# mode) ones. Each tenant (X-Tenant-ID header, else cohort, else client address) may
+# start REPORT_SCHEDULER_RATE PDF requests per second with bursts of
+# REPORT_SCHEDULER_BURST (rate 0: no limit). Past the queue limits or after
+# REPORT_SCHEDULER_MAX_WAIT seconds of waiting (0: no limit) interactive
+# requests get 429 with Retry-After; queued jobs always wait for their turn.
+SCHEDULER_SLOTS = int(os.environ.get("REPORT_SCHEDULER_SLOTS", str(RENDER_PROCESSES or 4)))
+SCHEDULER_INTERACTIVE_WEIGHT = float(os.environ.get("REPORT_SCHEDULER_INTERACTIVE_WEIGHT", "4"))
+SCHEDULER_BULK_WEIGHT = float(os.environ.get("REPORT_SCHEDULER_BULK_WEIGHT", "1"))
+SCHEDULER_RATE = float(os.environ.get("REPORT_SCHEDULER_RATE", "2"))
+SCHEDULER_BURST = int(os.environ.get("REPORT_SCHEDULER_BURST", "20"))
+SCHEDULER_MAX_QUEUED = int(os.environ.get("REPORT_SCHEDULER_MAX_QUEUED", "64"))
+SCHEDULER_MAX_QUEUED_PER_TENANT = int(os.environ.get("REPORT_SCHEDULER_MAX_QUEUED_PER_TENANT", "16"))
+SCHEDULER_MAX_WAIT = float(os.environ.get("REPORT_SCHEDULER_MAX_WAIT", "30"))
@@ -0,0 +1,126 @@
+import hashlib
+import json
+from datetime import datetime
+from io import BytesIO
+
+from itertools import islice
+
+import config
+from PDF_Generator_final import metrics_flowables, report_doc, summary_flowables
+from report_cache import ReportCache
+from report_metrics import stage
+from report_template import get_report_template
+from transcript_appendix import StreamedFlowables, transcript_flowables
+
+# Incremental rendering: a report is laid out as two independently cached PDF
+# segments, the summary pages (title, Influence Quotient, chart, qualitative
+# bullets) and the Detailed Evaluation Metrics pages. Each segment is keyed on
+# exactly the inputs it prints, so re-scoring one parameter or regenerating the
+# LLM feedback only re-lays-out the segments whose inputs changed. The cached
+# pages are then merged with pypdf, an optional dependency.
+
+# Bump when the layout of either segment changes so stale segments are not reused
+SEGMENT_VERSION = 1
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+
+def available():
+    return pypdf is not None
+
+
+def _segment_key(name, inputs):
+    encoded = json.dumps([name, SEGMENT_VERSION, inputs], sort_keys=True, separators=(",", ":"),
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _render_segment(template, flowables, page_offset=0):
+    # flowables may be a StreamedFlowables list
+    buffer = BytesIO()
+    doc = report_doc(buffer, template.profile)
+    doc.page_offset = page_offset
+    with stage("layout"):
+        doc.build(flowables, onFirstPage=template.header_footer, onLaterPages=template.header_footer)
+    return buffer.getvalue()
+
+
+def _page_count(pdf_bytes):
+    return len(pypdf.PdfReader(BytesIO(pdf_bytes)).pages)
+
+
+class IncrementalRenderer:
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=24 * 3600):
+        self.segments = ReportCache(max_bytes=max_bytes, ttl=ttl)
+
+    def _segment(self, name, inputs, build):
+        key = _segment_key(name, inputs)
+        pdf_bytes = self.segments.get(key)
+        if pdf_bytes is None:
+            pdf_bytes = build()
+            self.segments.put(key, pdf_bytes)
+        return pdf_bytes
+
+    def render(self, logo_path, tabular_data, scores_data, quality_data, presentation_mode="off",
+               profile="standard", transcript=None):
+        # Same arguments and output as create_combined_pdf_buffer, except that the
+        # compact profile's optimize_pdf pass is left to the caller
+        template = get_report_template(presentation_mode, logo_path, profile=profile)
+        tabular_data = dict(tabular_data)
+        tabular_data.setdefault("Report Date", datetime.now().strftime("%d %B %Y"))
+        branding = [template.logo_path, template.website_url, template.profile]
+
+        summary_inputs = {
+            "branding": branding,
+            "name": tabular_data.get("User Name"),
+            "date": tabular_data["Report Date"],
+            "cohort": [tabular_data.get("Cohort Percentile"), tabular_data.get("Cohort Size")],
+            "scores": list(scores_data.items()),
+            "quality": quality_data,
+        }
+        summary_pdf = self._segment("summary", summary_inputs, lambda: _render_segment(
+            template, summary_flowables(tabular_data, scores_data, quality_data, template)))
+        summary_pages = _page_count(summary_pdf)
+
+        # The metrics pages print their page numbers, so they depend on the summary length
+        confidence_keys = [key for _, key in template.confidence_sub_items]
+        metrics_inputs = {
+            "branding": branding,
+            "presentation_mode": template.presentation_mode,
+            "page_offset": summary_pages,
+            "ratings": list(scores_data.values()),
+            "confidence": [tabular_data.get(key) for key in confidence_keys],
+            "llm": tabular_data.get("LLM"),
+            "speech_metrics": tabular_data.get("Speech Metrics"),
+        }
+        metrics_pdf = self._segment("metrics", metrics_inputs, lambda: _render_segment(
+            template, metrics_flowables(tabular_data, scores_data, template), page_offset=summary_pages))
+
+        segments = [summary_pdf, metrics_pdf]
+        if transcript is not None:
+            appendix_inputs = {
+                "branding": branding,
+                "page_offset": summary_pages + _page_count(metrics_pdf),
+                "transcript": transcript,
+                "caps": [config.TRANSCRIPT_MAX_SEGMENTS, config.TRANSCRIPT_MAX_CHARS],
+            }
+            # The segment starts on its own page, so the appendix's leading PageBreak is dropped
+            segments.append(self._segment("transcript", appendix_inputs, lambda: _render_segment(
+                template, StreamedFlowables([], islice(transcript_flowables(transcript, template), 1, None)),
+                page_offset=appendix_inputs["page_offset"])))
+
+        with stage("merge"):
+            writer = pypdf.PdfWriter()
+            for segment_pdf in segments:
+                writer.append(BytesIO(segment_pdf))
+            # Every segment embeds the same logo; keep a single copy. The second pass
+            # merges the image dictionaries once their soft masks have been merged.
+            writer.compress_identical_objects()
+            writer.compress_identical_objects()
+            buffer = BytesIO()
+            writer.write(buffer)
+        buffer.seek(0)
+        return buffer
@@ -0,0 +1,89 @@
+import zlib
+from io import BytesIO
+
+# The "compact" output profile. Reports are laid out with downsampled images
+# and a vector chart (see ReportTemplate), and the finished PDF then goes
+# through optimize_pdf: ReportLab's ASCII85 wrapping is dropped from every
+# stream (it inflates binary data by a quarter), Flate streams are recompressed
+# at the highest level and identical objects are stored once. The pass uses
+# pypdf, an optional dependency; without it the ReportLab output is kept as is.
+
+PROFILES = ("standard", "compact")
+
+try:
+    import pypdf
+    from pypdf.filters import ASCII85Decode
+    from pypdf.generic import ArrayObject, DictionaryObject, NameObject, StreamObject
+except ImportError:
+    pypdf = None
+
+
+def available():
+    return pypdf is not None
+
+
+def _filters(stream):
+    filters = stream.get("/Filter")
+    if filters is None:
+        return []
+    if isinstance(filters, str):
+        return [filters]
+    return list(filters)
+
+
+def _recompress(stream):
+    filters = _filters(stream)
+    if not filters or "/DecodeParms" in stream:
+        return
+    data = stream._data
+    if filters[0] == "/ASCII85Decode":
+        data = ASCII85Decode.decode(data)
+        filters = filters[1:]
+    if filters == ["/FlateDecode"]:
+        data = zlib.compress(zlib.decompress(data), 9)
+    elif filters:
+        # DCT (JPEG) and other encodings are kept, only the ASCII85 layer goes
+        if len(filters) == len(_filters(stream)):
+            return
+    stream._data = data
+    if not filters:
+        del stream["/Filter"]
+    elif len(filters) == 1:
+        stream[NameObject("/Filter")] = NameObject(filters[0])
+    else:
+        stream[NameObject("/Filter")] = ArrayObject(NameObject(name) for name in filters)
+
+
+def _walk_streams(root):
+    # Every stream reachable from the document root, each visited once
+    seen = set()
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        if hasattr(obj, "idnum"):
+            if obj.idnum in seen:
+                continue
+            seen.add(obj.idnum)
+            obj = obj.get_object()
+        if isinstance(obj, StreamObject):
+            yield obj
+        if isinstance(obj, DictionaryObject):
+            pending.extend(obj.values())
+        elif isinstance(obj, ArrayObject):
+            pending.extend(obj)
+
+
+def optimize_pdf(pdf_bytes):
+    if pypdf is None:
+        return pdf_bytes
+    writer = pypdf.PdfWriter(clone_from=BytesIO(pdf_bytes))
+    for stream in _walk_streams(writer.root_object):
+        _recompress(stream)
+    # Identical images (and their soft masks) collapse in two passes
+    writer.compress_identical_objects()
+    writer.compress_identical_objects()
+    buffer = BytesIO()
+    writer.write(buffer)
+    optimized = buffer.getvalue()
+    # Never hand back something larger than the input
+    return optimized if len(optimized) < len(pdf_bytes) else pdf_bytes
@@ -1,17 +1,202 @@
-import matplotlib.pyplot as plt 
+import hashlib
 import json 
-import matplotlib# Assume a 5-point scale
-import matplotlib.pyplot as plt
-import numpy as np
+import threading
+from io import BytesIO
+from itertools import product
+from reportlab.graphics.shapes import Drawing, Group, Line, String
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+from reportlab.platypus import Image
+import config
+from report_cache import ReportCache
+from report_metrics import CHART_CACHE_LOOKUPS
+from report_template import SCORE_MAPPING
 
-matplotlib.use('Agg')  # Non-interactive backend
+# matplotlib is optional and only imported when the "matplotlib" backend is used
 
+# Bump whenever render_score_chart draws differently, so cached PNGs from the
+# previous style (in memory or in REPORT_CHART_CACHE_DIR) are no longer used
+CHART_STYLE_VERSION = 1
+
+
+def score_chart_series(data):
+    # The chart plots the last four entries of the scores dict, newest first
+    items = list(data.items())
+    values = [value for _, value in reversed(items[-4:])]
+    labels = [label for label, _ in reversed(items[-4:])]
+    return labels, values
+
+
+def chart_points(values):
+    # Numeric values for the vector chart, with rating strings ("Good") at their
+    # SCORE_MAPPING points; None when a value is neither
+    points = []
+    for value in values:
+        if isinstance(value, str):
+            value = SCORE_MAPPING.get(value)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return None
+        points.append(value)
+    return points
+
+
+def render_score_chart(data):
+    # Thread-safe variant of generate_radar_chart: a private Figure with its own
+    # Agg canvas instead of the global pyplot figure, rendered into a PNG buffer
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    labels, values = score_chart_series(data)
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(labels, values, marker="s")
+    ax.grid(axis='x', which='both', linestyle='-', linewidth=1.5, color='gray', alpha=0.6)
+    ax.set_xlabel("Parameters")
+    ax.set_ylabel("Percentage")
+    ax.set_title("Scores", fontsize=16, fontweight='bold')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    fig.tight_layout()
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', pad_inches=0.2)
+    buffer.seek(0)
+    return buffer
+
+
+# The chart only shows four scores on a small discrete scale, so far fewer
+# distinct charts exist than reports: finished PNGs are kept in an LRU (with an
+# optional on-disk tier shared by render processes) keyed on what is plotted
+_chart_cache = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    global _chart_cache
+    with _chart_cache_lock:
+        if _chart_cache is None:
+            _chart_cache = ReportCache(max_bytes=config.CHART_CACHE_MAX_BYTES, ttl=float("inf"),
+                                       directory=config.CHART_CACHE_DIR or None,
+                                       disk_max_bytes=config.CHART_CACHE_DISK_MAX_BYTES, suffix=".png")
+        return _chart_cache
+
+
+def chart_cache_key(labels, values):
+    # 4 and 4.0 plot the same point, so numbers are keyed as floats
+    values = [float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+              for value in values]
+    encoded = json.dumps([CHART_STYLE_VERSION, [str(label) for label in labels], values],
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cached_score_chart(data):
+    # PNG bytes of the matplotlib Scores chart, rendered only on a cache miss
+    if config.CHART_CACHE_MAX_BYTES <= 0:
+        return render_score_chart(data).getvalue()
+    labels, values = score_chart_series(data)
+    key = chart_cache_key(labels, values)
+    cache = get_chart_cache()
+    png = cache.get(key)
+    if png is not None:
+        CHART_CACHE_LOOKUPS.inc(result="hit")
+        return png
+    CHART_CACHE_LOOKUPS.inc(result="miss")
+    png = render_score_chart(data).getvalue()
+    cache.put(key, png)
+    return png
+
+
+def prewarm_score_charts(labels=None, values=None):
+    # Render every combination of values for one label set into the chart cache
+    # (5 values over 4 labels is 625 charts); returns how many were rendered.
+    # Defaults to REPORT_CHART_PREWARM_LABELS and the integer scores 1-5.
+    labels = list(labels or config.CHART_PREWARM_LABELS)
+    values = list(values or range(1, 6))
+    cache = get_chart_cache()
+    rendered = 0
+    for combination in product(values, repeat=len(labels)):
+        data = dict(zip(labels, combination))
+        key = chart_cache_key(*score_chart_series(data))
+        if cache.get(key) is None:
+            cache.put(key, render_score_chart(data).getvalue())
+            rendered += 1
+    return rendered
+
+
+def score_chart_drawing(data, width, height):
+    # Vector version of the Scores chart built from reportlab.graphics primitives,
+    # so it is embedded as PDF drawing operators instead of a raster image
+    labels, values = score_chart_series(data)
+    values = chart_points(values)
+    if values is None:
+        raise ValueError("The vector chart only plots numbers and rating strings")
+    drawing = Drawing(width, height)
+    drawing.add(String(width / 2, height - 18, "Scores", fontName="Helvetica-Bold",
+                       fontSize=16, textAnchor="middle"))
+
+    chart = HorizontalLineChart()
+    chart.x = 50
+    chart.y = 40
+    chart.width = width - 70
+    chart.height = height - 75
+    chart.data = [values]
+    chart.joinedLines = 1
+    chart.lines[0].strokeColor = colors.HexColor("#1f77b4")
+    chart.lines[0].strokeWidth = 1.5
+    chart.lines[0].symbol = makeMarker("FilledSquare", size=6,
+                                       fillColor=colors.HexColor("#1f77b4"),
+                                       strokeColor=colors.HexColor("#1f77b4"))
+    chart.categoryAxis.categoryNames = [str(label) for label in labels]
+    chart.categoryAxis.labels.fontName = "Helvetica"
+    chart.categoryAxis.labels.fontSize = 9
+    chart.valueAxis.valueMin = 0
+    if max(values) <= 5:
+        chart.valueAxis.valueMax = 5
+        chart.valueAxis.valueStep = 1
+    chart.valueAxis.labels.fontName = "Helvetica"
+    chart.valueAxis.labels.fontSize = 9
+    # Vertical grid through each data point, drawn under the line like axis='x' in matplotlib
+    bucket = chart.width / len(values)
+    for i in range(len(values)):
+        x = chart.x + (i + 0.5) * bucket
+        drawing.add(Line(x, chart.y, x, chart.y + chart.height,
+                         strokeColor=colors.Color(0.5, 0.5, 0.5, alpha=0.6), strokeWidth=1.5))
+    drawing.add(chart)
+
+    drawing.add(String(chart.x + chart.width / 2, 8, "Parameters", fontName="Helvetica", fontSize=10,
+                       textAnchor="middle"))
+    # Rotated 90 degrees counter-clockwise next to the value axis
+    drawing.add(Group(String(0, 0, "Percentage", fontName="Helvetica", fontSize=10, textAnchor="middle"),
+                      transform=(0, 1, -1, 0, 14, chart.y + chart.height / 2)))
+    return drawing
+
+
+def score_chart_flowable(data, width, height, backend=None):
+    # Returns a flowable for the Scores chart using the configured backend
+    backend = backend or config.CHART_BACKEND
+    # Free-form score strings are only plotted by matplotlib, as categories
+    if backend == "matplotlib" or chart_points(score_chart_series(data)[1]) is None:
+        try:
+            return Image(BytesIO(cached_score_chart(data)), width=width, height=height)
+        except ImportError as e:
+            print(f"matplotlib unavailable, using vector chart: {e}")
+    return score_chart_drawing(data, width, height)
+
+
+def generate_radar_chart(output_path='radar_chart.png', data=None):
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend
+    import matplotlib.pyplot as plt
 
-def generate_radar_chart(output_path='radar_chart.png'):
     values = []
     labels = []
-    with open(r'json/scores.json' , 'r') as fp:
-        data = json.load(fp)
+    # Callers that already hold the parsed scores pass them in directly
+    if data is None:
+        with open(r'json/scores.json' , 'r') as fp:
+            data = json.load(fp)
     items = list(data.items()) 
     print("Items: ", items)
     print(items[-1][1])
@@ -40,4 +225,4 @@ def generate_radar_chart(output_path='radar_chart.png'):
 
 
 
-# generate_radar_chart("output.png")
\ No newline at end of file
+# generate_radar_chart("output.png")
@@ -0,0 +1,69 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pool for PDF rendering. ReportLab layout is CPU bound and holds the
+# GIL, so threads alone keep a server on one core; worker processes do not.
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # Pay the import and font metric costs once per worker, not per report
+    import PDF_Generator_final  # noqa: F401
+    import plot_generator  # noqa: F401
+    from reportlab.pdfbase import pdfmetrics
+    for font_name in ("Helvetica", "Helvetica-Bold"):
+        pdfmetrics.getFont(font_name)
+    from report_assets import load_image
+    from report_template import DEFAULT_LOGO_PATH
+    try:
+        load_image(DEFAULT_LOGO_PATH)
+    except OSError as e:
+        print(f"Could not preload logo: {e}")
+
+
+def _ping():
+    return True
+
+
+def _render_pdf_bytes(logo_path, tabular_data, scores_data, quality_data, presentation_mode, profile, transcript):
+    from PDF_Generator_final import render_combined_pdf
+    return render_combined_pdf(logo_path, tabular_data, scores_data, quality_data,
+                               presentation_mode=presentation_mode, profile=profile, transcript=transcript)
+
+
+def get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the server process already runs threads
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker)
+        return _pool
+
+
+def warm_up(workers):
+    # Start every worker now so the first requests do not pay for process startup
+    pool = get_pool(workers)
+    for future in [pool.submit(_ping) for _ in range(workers)]:
+        future.result()
+
+
+def render_pdf(workers, logo_path, tabular_data, scores_data, quality_data, presentation_mode="off",
+               profile="standard", transcript=None):
+    # Returns (pdf_bytes, rendered_size) like PDF_Generator_final.render_combined_pdf;
+    # the compact profile's optimization pass runs in the worker too
+    pool = get_pool(workers)
+    return pool.submit(_render_pdf_bytes, logo_path, tabular_data, scores_data, quality_data,
+                       presentation_mode, profile, transcript).result()
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,290 @@
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from report_metrics import Counter, Gauge, Histogram, register
+
+# Admission control and fair ordering for PDF renders. Requests carry a tenant
+# (the X-Tenant-ID header, else the cohort, else the client address) and a priority
+# class: "interactive" for a single report a person is waiting on, "bulk" for
+# job mode. Each tenant has a token bucket that limits how fast it can start
+# renders. Renders then wait for one of a fixed number of slots. Waiting
+# renders are ordered by weighted fair queuing (start-time fair queuing over
+# (priority, tenant) flows), so a tenant with hundreds of queued reports only
+# gets its fair share of the slots, and interactive reports get `weight` times
+# the share of bulk ones. Requests that are over their rate, that would overflow
+# the queue, or that wait too long are rejected with a Retry-After estimate.
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+SCHEDULER_QUEUED = register(Gauge("report_scheduler_queued", "Renders waiting for a scheduler slot.",
+                                  ["priority"]))
+SCHEDULER_RUNNING = register(Gauge("report_scheduler_running", "Renders holding a scheduler slot.",
+                                   ["priority"]))
+SCHEDULER_REJECTED = register(Counter("report_scheduler_rejected_total",
+                                      "Renders rejected by the scheduler, by reason.", ["priority", "reason"]))
+SCHEDULER_WAIT_SECONDS = register(Histogram("report_scheduler_wait_seconds",
+                                            "Time renders waited for a scheduler slot.", ["priority"]))
+
+
+class Throttled(Exception):
+    # Rejected by the scheduler; retry_after is the suggested wait in whole seconds
+    def __init__(self, reason, retry_after):
+        Exception.__init__(self, reason)
+        self.reason = reason
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now):
+        # Takes one token and returns 0, or returns the seconds until one is available
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def full(self, now):
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class _Waiter:
+    __slots__ = ("tenant", "priority", "event", "notify", "dispatched", "cancelled", "enqueued_at")
+
+    def __init__(self, tenant, priority, now, notify=None):
+        self.tenant = tenant
+        self.priority = priority
+        self.event = threading.Event()
+        # Called (under the scheduler lock) when the waiter gets its slot
+        self.notify = notify
+        self.dispatched = False
+        self.cancelled = False
+        self.enqueued_at = now
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class FairScheduler:
+    def __init__(self, slots=4, weights=None, rate=2.0, burst=20, max_queued=64, max_queued_per_tenant=16,
+                 max_wait=30.0):
+        self.slots = slots
+        self.weights = weights or {INTERACTIVE: 4, BULK: 1}
+        # Token buckets refill at rate renders/second up to burst; rate 0 disables them
+        self.rate = rate
+        self.burst = burst
+        self.max_queued = max_queued
+        self.max_queued_per_tenant = max_queued_per_tenant
+        # Seconds a render may wait for a slot before it is rejected; 0 waits as long as it takes
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._buckets = {}  # tenant -> TokenBucket
+        self._heap = []  # (finish tag, sequence, waiter)
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish = {}  # (priority, tenant) -> finish tag of its latest render
+        self._queued = {}  # tenant -> waiting renders
+        self._queued_by_priority = {priority: 0 for priority in self.weights}
+        self._running = {priority: 0 for priority in self.weights}
+        self._running_total = 0
+        self._admitted = 0
+        self._rejected = {}  # reason -> count
+        # Moving average of render seconds, for Retry-After estimates
+        self._render_seconds = 1.0
+
+    def _reject(self, priority, reason, retry_after):
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        SCHEDULER_REJECTED.inc(priority=priority, reason=reason)
+        raise Throttled(reason, retry_after)
+
+    def _queue_retry_after(self, ahead):
+        # Seconds until `ahead` queued renders have gone through the slots
+        return (ahead / max(self.slots, 1) + 1) * self._render_seconds
+
+    def admit(self, tenant, priority=INTERACTIVE):
+        # Charge one render to the tenant's token bucket; raises Throttled when it is empty
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(tenant)
+            if bucket is None:
+                bucket = self._buckets[tenant] = TokenBucket(self.rate, self.burst, now)
+            wait = bucket.take(now)
+            if wait:
+                self._reject(priority, "rate_limited", wait)
+            # Full buckets carry no state, so idle tenants do not accumulate
+            if len(self._buckets) > 1024:
+                for idle in [name for name, b in self._buckets.items() if b.full(now)]:
+                    del self._buckets[idle]
+
+    @contextmanager
+    def slot(self, tenant, priority=INTERACTIVE, max_wait=None):
+        # Hold one render slot for the duration of the block, waiting for it in
+        # fair-queuing order; raises Throttled if the queue is full or the wait
+        # exceeds max_wait (default: the scheduler's; 0 waits as long as it takes)
+        waiter = self._enqueue(tenant, priority)
+        if waiter is not None:
+            self._wait(waiter, self.max_wait if max_wait is None else max_wait)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(priority, time.monotonic() - start)
+
+    @asynccontextmanager
+    async def async_slot(self, tenant, priority=INTERACTIVE, max_wait=None):
+        # slot() for asyncio code: the wait happens on the event loop, so queued
+        # requests hold no thread and the work in the block (typically handed to
+        # an executor) starts in fair-queuing order
+        loop = asyncio.get_running_loop()
+        dispatched = loop.create_future()
+        waiter = self._enqueue(tenant, priority, lambda: loop.call_soon_threadsafe(_resolve, dispatched))
+        if waiter is not None:
+            max_wait = self.max_wait if max_wait is None else max_wait
+            try:
+                await asyncio.wait_for(asyncio.shield(dispatched), max_wait or None)
+            except asyncio.TimeoutError:
+                self._timed_out(waiter)
+            except asyncio.CancelledError:
+                # The client went away; give back the slot if it arrived meanwhile
+                if not self._cancel(waiter):
+                    self._release(priority)
+                raise
+            else:
+                SCHEDULER_WAIT_SECONDS.observe(time.monotonic() - waiter.enqueued_at, priority=priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(priority, time.monotonic() - start)
+
+    def _enqueue(self, tenant, priority, notify=None):
+        # Returns None when a slot was free and nothing was waiting, else the queued waiter
+        now = time.monotonic()
+        with self._lock:
+            queued = sum(self._queued_by_priority.values())
+            if self._running_total < self.slots and not queued:
+                self._finish_tag(tenant, priority)
+                self._start(priority)
+                SCHEDULER_WAIT_SECONDS.observe(0, priority=priority)
+                return None
+            if queued >= self.max_queued:
+                self._reject(priority, "queue_full", self._queue_retry_after(queued))
+            if self._queued.get(tenant, 0) >= self.max_queued_per_tenant:
+                self._reject(priority, "tenant_queue_full", self._queue_retry_after(queued))
+            waiter = _Waiter(tenant, priority, now, notify)
+            heapq.heappush(self._heap, (self._finish_tag(tenant, priority), next(self._sequence), waiter))
+            self._queued[tenant] = self._queued.get(tenant, 0) + 1
+            self._queued_by_priority[priority] += 1
+            SCHEDULER_QUEUED.inc(priority=priority)
+            self._dispatch()
+            return waiter
+
+    def _finish_tag(self, tenant, priority):
+        # A flow's next render starts where its previous one finished, or at the
+        # current virtual time if it has been idle, and costs 1 / weight
+        flow = (priority, tenant)
+        finish_tag = max(self._virtual_time, self._last_finish.get(flow, 0.0)) + 1.0 / self.weights[priority]
+        self._last_finish[flow] = finish_tag
+        return finish_tag
+
+    def _wait(self, waiter, max_wait):
+        if waiter.event.wait(max_wait or None):
+            SCHEDULER_WAIT_SECONDS.observe(time.monotonic() - waiter.enqueued_at, priority=waiter.priority)
+            return
+        self._timed_out(waiter)
+
+    def _timed_out(self, waiter):
+        # Rejects a waiter whose wait ran out, unless its slot was handed over just now
+        with self._lock:
+            if self._cancel_locked(waiter):
+                self._reject(waiter.priority, "wait_timeout",
+                             self._queue_retry_after(sum(self._queued_by_priority.values())))
+
+    def _cancel(self, waiter):
+        with self._lock:
+            return self._cancel_locked(waiter)
+
+    def _cancel_locked(self, waiter):
+        # Takes the waiter out of the queue; False when it already holds a slot
+        if waiter.dispatched:
+            return False
+        waiter.cancelled = True
+        self._dequeued(waiter)
+        return True
+
+    def _dequeued(self, waiter):
+        remaining = self._queued[waiter.tenant] - 1
+        if remaining:
+            self._queued[waiter.tenant] = remaining
+        else:
+            del self._queued[waiter.tenant]
+        self._queued_by_priority[waiter.priority] -= 1
+        SCHEDULER_QUEUED.dec(priority=waiter.priority)
+
+    def _start(self, priority):
+        self._running[priority] += 1
+        self._running_total += 1
+        self._admitted += 1
+        SCHEDULER_RUNNING.inc(priority=priority)
+
+    def _release(self, priority, seconds=None):
+        # seconds is how long the slot was used; None when it never was
+        with self._lock:
+            self._running[priority] -= 1
+            self._running_total -= 1
+            SCHEDULER_RUNNING.dec(priority=priority)
+            if seconds is not None:
+                self._render_seconds = 0.8 * self._render_seconds + 0.2 * seconds
+            self._dispatch()
+
+    def _dispatch(self):
+        # Hand free slots to the waiters with the smallest finish tags
+        while self._heap and self._running_total < self.slots:
+            finish_tag, _, waiter = heapq.heappop(self._heap)
+            if waiter.cancelled:
+                continue
+            self._virtual_time = max(self._virtual_time, finish_tag - 1.0 / self.weights[waiter.priority])
+            self._dequeued(waiter)
+            waiter.dispatched = True
+            self._start(waiter.priority)
+            waiter.event.set()
+            if waiter.notify is not None:
+                waiter.notify()
+        if not self._queued:
+            # Nothing is waiting, so past finish tags no longer matter
+            self._last_finish = {flow: tag for flow, tag in self._last_finish.items() if tag > self._virtual_time}
+
+    def stats(self):
+        with self._lock:
+            busiest = sorted(self._queued.items(), key=lambda item: -item[1])[:10]
+            return {
+                "slots": self.slots,
+                "weights": dict(self.weights),
+                "running": dict(self._running),
+                "queued": dict(self._queued_by_priority),
+                "queued_tenants": len(self._queued),
+                "busiest_tenants": [{"tenant": tenant, "queued": queued} for tenant, queued in busiest],
+                "admitted": self._admitted,
+                "rejected": dict(self._rejected),
+                "avg_render_seconds": round(self._render_seconds, 3),
+                "rate": self.rate,
+                "burst": self.burst,
+                "max_queued": self.max_queued,
+                "max_queued_per_tenant": self.max_queued_per_tenant,
+                "max_wait": self.max_wait,
+            }
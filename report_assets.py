@@ -0,0 +1,59 @@
+import os
+import threading
+from io import BytesIO
+from reportlab.lib.utils import ImageReader
+
+# Process-wide cache of decoded report images (logos). Each file is read and
+# decoded once and reused by every report until its mtime or size changes.
+
+_images = {}  # (absolute path, fit) -> (mtime, size, ImageReader)
+_images_lock = threading.Lock()
+
+
+def fit_image(path, size, dpi, jpeg_quality=None):
+    # Downsample an image to at most dpi at its printed size (in points). Opaque
+    # images are re-encoded as JPEG when that is smaller than the lossless copy.
+    from PIL import Image
+    with Image.open(path) as source:
+        image = source.convert("RGBA" if source.mode in ("P", "LA", "PA") else source.mode)
+    max_width = max(1, round(size[0] / 72 * dpi))
+    max_height = max(1, round(size[1] / 72 * dpi))
+    if image.width > max_width or image.height > max_height:
+        image.thumbnail((max_width, max_height))
+    encoded = BytesIO()
+    image.save(encoded, format="PNG", optimize=True)
+    if jpeg_quality is not None and image.mode in ("RGB", "L"):
+        jpeg = BytesIO()
+        image.save(jpeg, format="JPEG", quality=jpeg_quality, optimize=True)
+        if jpeg.tell() < encoded.tell():
+            encoded = jpeg
+    encoded.seek(0)
+    return ImageReader(encoded)
+
+
+def load_image(path, size=None, dpi=None, jpeg_quality=None):
+    # size/dpi/jpeg_quality select a downsampled copy for the compact profile
+    path = os.path.abspath(path)
+    fit = (size, dpi, jpeg_quality) if dpi else None
+    stat = os.stat(path)
+    cached = _images.get((path, fit))
+    if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        return cached[2]
+    with _images_lock:
+        cached = _images.get((path, fit))
+        if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+        if fit is not None:
+            reader = fit_image(path, size, dpi, jpeg_quality)
+        else:
+            reader = ImageReader(path)
+        # Decode now so concurrent reports only ever read the cached pixel data
+        reader.getRGBData()
+        reader.getTransparent()
+        _images[(path, fit)] = (stat.st_mtime, stat.st_size, reader)
+        return reader
+
+
+def clear_images():
+    with _images_lock:
+        _images.clear()
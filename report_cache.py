@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# Content-addressed cache of finished PDFs, keyed on the canonical request payload.
+# Entries live in an in-memory LRU and, when a directory is configured, on disk.
+
+CACHE_KEY_FIELDS = ("transcript", "audio", "video", "score", "qualitative", "LLM",
+                    "presentation_mode", "user_name", "cohort", "cohort_percentile", "pdf_profile",
+                    "transcript_appendix")
+
+
+def _canonical(value):
+    # The nested fields arrive as JSON strings; key on their parsed form so
+    # whitespace or key order differences still hit the same entry
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def payload_cache_key(data, date=None):
+    return canonical_cache_key({field: _canonical(data.get(field)) for field in CACHE_KEY_FIELDS}, date)
+
+
+def canonical_cache_key(fields, date=None):
+    # fields holds the already decoded payload values.
+    # The report prints the generation date, so it is part of the key
+    if date is None:
+        date = datetime.now().strftime("%d %B %Y")
+    canonical = {field: fields.get(field) for field in CACHE_KEY_FIELDS}
+    canonical["date"] = date
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600, directory=None, disk_max_bytes=512 * 1024 * 1024,
+                 suffix=".pdf"):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        # File extension of the on-disk entries
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (created_at, pdf bytes)
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> size, least recently used first
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load_disk_index()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, pdf = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    return pdf
+                self._drop_memory(key)
+            if key not in self._disk:
+                return None
+            path = self._disk_path(key)
+            try:
+                created_at = os.path.getmtime(path)
+                if now - created_at > self.ttl:
+                    self._drop_disk(key)
+                    return None
+                with open(path, "rb") as f:
+                    pdf = f.read()
+            except OSError:
+                self._disk.pop(key, None)
+                return None
+            self._disk.move_to_end(key)
+            self._put_memory(key, pdf, created_at)
+            return pdf
+
+    def put(self, key, pdf):
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, pdf, now)
+            if self.directory:
+                self._put_disk(key, pdf)
+
+    def _put_memory(self, key, pdf, created_at):
+        if len(pdf) > self.max_bytes:
+            return
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (created_at, pdf)
+        self._memory_bytes += len(pdf)
+        while self._memory_bytes > self.max_bytes:
+            self._drop_memory(next(iter(self._memory)))
+
+    def _drop_memory(self, key):
+        _, pdf = self._memory.pop(key)
+        self._memory_bytes -= len(pdf)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}{self.suffix}")
+
+    def _put_disk(self, key, pdf):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp_path, path)
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+        self._disk[key] = len(pdf)
+        self._disk_bytes += len(pdf)
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            self._drop_disk(next(iter(self._disk)))
+
+    def _drop_disk(self, key):
+        self._disk_bytes -= self._disk.pop(key)
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def _load_disk_index(self):
+        entries = []
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for filename in os.listdir(shard_dir):
+                if filename.endswith(self.suffix):
+                    stat = os.stat(os.path.join(shard_dir, filename))
+                    entries.append((stat.st_mtime, filename[:-len(self.suffix)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
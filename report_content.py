@@ -0,0 +1,105 @@
+import re
+from datetime import datetime
+from plot_generator import score_chart_series
+from report_template import get_report_template
+from speech_metrics import delivery_lines
+
+# Format-independent content of a report. The PDF generator and the HTML/JSON
+# renderers all print from this model, so every output format shows the same
+# name, date, Influence Quotient, qualitative bullets and metrics rows.
+
+
+def clean_answer(answer):
+    return re.sub(r'^\d+\.\s*', '', answer).strip()
+
+
+def influence_quotient(scores_data, score_mapping):
+    # midval is a list of textual ratings (e.g., "Excellent", "Good", etc.)
+    midval = list(scores_data.values())
+    # Compute total score and maximum possible score
+    total_score = 0
+    max_score = len(midval) * 5  # Maximum score is 5 per question
+    for rating in midval:
+        total_score += score_mapping.get(rating, 0)
+
+    # Calculate prorated score (out of 100)
+    if max_score > 0:
+        return round((total_score / max_score) * 100)
+    return 0
+
+
+def metrics_rows(tabular_data, scores_data, template):
+    score_mapping = template.score_mapping
+    midval = list(scores_data.values())
+
+    llm_answers = []
+    if 'LLM' in tabular_data:
+        llm_answers = re.split(r'\n(?=\d+\.)', tabular_data['LLM'])
+
+    rows = []
+    for i, question in enumerate(template.llm_questions[1:], 1):
+        # For the middle column, display only the numeric score (if available)
+        if i <= len(midval) and midval[i - 1] in score_mapping:
+            numeric_score = str(score_mapping[midval[i - 1]])
+        else:
+            numeric_score = "N/A"
+
+        if i == 1:
+            sub_items = template.confidence_sub_items
+            feedback = []
+            for label, key in sub_items:
+                metric_value = tabular_data.get(key)
+                if metric_value in [1, 2, 3, 4, 5]:
+                    feedback.append(f"{label}: {metric_value}")
+                else:
+                    feedback.append(f"{label}: N/A")
+            rows.append({"number": i, "parameter": question, "sub_items": [label for label, _ in sub_items],
+                         "score": numeric_score, "feedback": feedback})
+        else:
+            answer_index = i if i < len(llm_answers) else None
+            if answer_index is not None:
+                answer = clean_answer(llm_answers[answer_index])
+                # Split the answer into lines for bullet points
+                answer_lines = [line.strip() for line in answer.split('\n') if line.strip()]
+                if not answer_lines:
+                    answer_lines = ["N/A"]
+            else:
+                answer_lines = ["N/A"]
+            rows.append({"number": i, "parameter": question, "sub_items": [],
+                         "score": numeric_score, "feedback": answer_lines})
+
+    # Set by the server from the transcript's segment timings (speech_metrics.py)
+    speech_metrics = tabular_data.get('Speech Metrics')
+    if speech_metrics:
+        rows.append({"number": len(rows) + 1, "parameter": "Speech delivery (measured from the transcript)",
+                     "sub_items": [], "score": "N/A", "feedback": delivery_lines(speech_metrics)})
+    return rows
+
+
+def build_report_content(tabular_data, scores_data, quality_data, presentation_mode="off", template=None):
+    if template is None:
+        template = get_report_template(presentation_mode)
+    quality_data = quality_data if isinstance(quality_data, dict) else {}
+
+    content = {
+        "name": tabular_data.get('User Name', 'Unknown Candidate'),
+        # "Report Date" pins the printed date, e.g. for cached segments; defaults to today
+        "date": tabular_data.get('Report Date') or datetime.now().strftime("%d %B %Y"),
+        "presentation_mode": template.presentation_mode,
+        "influence_quotient": influence_quotient(scores_data, template.score_mapping),
+        "cohort": None,
+        "scores": dict(scores_data),
+        "chart": dict(zip(("labels", "values"), score_chart_series(scores_data))),
+        "qualitative": {
+            "positive": quality_data.get("Qualitative Analysis"),
+            "improvement": quality_data.get("Quantitative Analysis"),
+        },
+        "metrics": metrics_rows(tabular_data, scores_data, template),
+        # Raw delivery measurements behind the speech row, for JSON consumers
+        "speech": tabular_data.get('Speech Metrics'),
+    }
+    # Set by the server when the candidate was submitted as part of a cohort
+    if 'Cohort Percentile' in tabular_data:
+        content["cohort"] = {"percentile": tabular_data['Cohort Percentile'],
+                             "size": tabular_data.get('Cohort Size')}
+    return content
@@ -0,0 +1,134 @@
+import json
+from html import escape
+from report_content import build_report_content
+from transcript_appendix import capped_segments, omitted_text, segment_label
+
+# Lightweight HTML and JSON renderings of a report. Both are built from the
+# same content model as the PDF but skip ReportLab layout entirely, so they are
+# cheap enough for previews and for clients that post-process the data.
+
+MIMETYPES = {
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+    "json": "application/json",
+}
+
+HTML_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; max-width: 820px; margin: 24px auto; color: #222; }
+h1, .date { text-align: center; margin: 4px 0; }
+h2 { color: #1f3a5f; border-bottom: 1px solid #ccc; padding-bottom: 4px; }
+.iq { font-size: 20px; font-weight: bold; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #999; padding: 6px; vertical-align: top; text-align: left; }
+th { background: #d9e2f3; }
+td ul { margin: 0; padding-left: 18px; }
+"""
+
+
+def chart_svg(labels, values, width=560, height=260):
+    # Inline SVG version of the Scores line chart
+    if not values:
+        return ""
+    left, right, top, bottom = 50, 20, 30, 50
+    plot_width = width - left - right
+    plot_height = height - top - bottom
+    numeric = [value if isinstance(value, (int, float)) else 0 for value in values]
+    top_value = max(5, max(numeric))
+    step = plot_width / max(len(numeric) - 1, 1)
+
+    def point(i, value):
+        return left + i * step, top + plot_height - (value / top_value) * plot_height
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img">',
+             f'<text x="{width / 2}" y="20" text-anchor="middle" font-weight="bold" font-size="16">Scores</text>',
+             f'<line x1="{left}" y1="{top + plot_height}" x2="{left + plot_width}" y2="{top + plot_height}" stroke="#333"/>',
+             f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_height}" stroke="#333"/>']
+    points = [point(i, value) for i, value in enumerate(numeric)]
+    for (x, y), label in zip(points, labels):
+        parts.append(f'<line x1="{x:.1f}" y1="{top}" x2="{x:.1f}" y2="{top + plot_height}" stroke="#999" stroke-opacity="0.6"/>')
+        parts.append(f'<text x="{x:.1f}" y="{top + plot_height + 16}" text-anchor="middle" font-size="11">{escape(str(label))}</text>')
+    parts.append('<polyline fill="none" stroke="#1f77b4" stroke-width="2" points="'
+                 + " ".join(f"{x:.1f},{y:.1f}" for x, y in points) + '"/>')
+    for x, y in points:
+        parts.append(f'<rect x="{x - 3:.1f}" y="{y - 3:.1f}" width="6" height="6" fill="#1f77b4"/>')
+    parts.append(f'<text x="{width / 2}" y="{height - 8}" text-anchor="middle" font-size="12">Parameters</text>')
+    parts.append(f'<text x="14" y="{top + plot_height / 2}" text-anchor="middle" font-size="12" '
+                 f'transform="rotate(-90 14 {top + plot_height / 2})">Percentage</text>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def _bullets(items):
+    return "<ul>" + "".join(f"<li>{escape(str(item))}</li>" for item in items) + "</ul>"
+
+
+def render_html(content):
+    name = escape(str(content["name"]))
+    parts = ["<!DOCTYPE html>", '<html lang="en"><head><meta charset="utf-8">',
+             f"<title>{name} - Report</title>", f"<style>{HTML_STYLE}</style></head><body>",
+             f"<h1>{name}</h1>", f'<p class="date">{escape(str(content["date"]))}</p>',
+             "<h2>Assessment</h2>",
+             f'<p class="iq">Influence Quotient: {content["influence_quotient"]}/100</p>']
+    if content["cohort"] is not None:
+        parts.append(f'<p>Percentile vs cohort: {escape(str(content["cohort"]["percentile"]))} '
+                     f'(of {escape(str(content["cohort"]["size"] or "N/A"))} candidates)</p>')
+
+    parts.append("<h2>Overall Evaluation Summary</h2>")
+    parts.append(chart_svg(content["chart"]["labels"], content["chart"]["values"]))
+
+    qualitative = content["qualitative"]
+    if qualitative["positive"] is not None:
+        parts.append("<h2>Qualitative Analysis - Positive</h2>" + _bullets(qualitative["positive"]))
+    if qualitative["improvement"] is not None:
+        parts.append("<h2>Qualitative Analysis - Areas of Improvement</h2>" + _bullets(qualitative["improvement"]))
+
+    parts.append("<h2>Detailed Evaluation Metrics</h2>")
+    parts.append("<table><tr><th>No.</th><th>Individual Parameters</th><th>5 Point scale:</th>"
+                 "<th>Feedback: Excellent(5), Good(4), Satisfactory(3), Needs Improvement(2), Poor(1)</th></tr>")
+    for row in content["metrics"]:
+        parameter = escape(row["parameter"])
+        if row["sub_items"]:
+            parameter += _bullets(row["sub_items"])
+        parts.append(f'<tr><td>{row["number"]}.</td><td>{parameter}</td><td>{escape(row["score"])}</td>'
+                     f'<td>{"<br>".join(escape(str(line)) for line in row["feedback"])}</td></tr>')
+    parts.append("</table>")
+
+    if content.get("transcript") is not None:
+        parts.append("<h2>Appendix: Transcript</h2>")
+        for segment in content["transcript"]["segments"]:
+            label = escape(segment_label(segment["start"], segment["end"]))
+            parts.append(f"<p><b>{label}</b> {escape(segment['text'])}</p>" if label
+                         else f"<p>{escape(segment['text'])}</p>")
+        omitted = content["transcript"]["omitted"]
+        if omitted is not None:
+            parts.append(f"<p><i>{escape(omitted_text(omitted['start'], omitted['end'], omitted['count']))}</i></p>")
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def render_json(content):
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+RENDERERS = {"html": render_html, "json": render_json}
+
+
+def render_document(candidate, fmt):
+    # HTML/JSON body for a decoded candidate (see ReportRequest.to_candidate)
+    content = build_report_content(candidate["tabular_data"], candidate["scores_data"],
+                                   candidate["quality_data"], candidate.get("presentation_mode", "off"))
+    if candidate.get("transcript") is not None:
+        content["transcript"] = transcript_content(candidate["transcript"])
+    return RENDERERS[fmt](content)
+
+
+def transcript_content(transcript):
+    # The appendix with the same caps as the PDF
+    segments = []
+    omitted = None
+    for kind, start, end, value in capped_segments(transcript):
+        if kind == "segment":
+            segments.append({"start": start, "end": end, "text": value})
+        else:
+            omitted = {"start": start, "end": end, "count": value}
+    return {"segments": segments, "omitted": omitted}
@@ -0,0 +1,225 @@
+import json
+import re
+
+# Single-pass ingestion of /create_report payloads. The nested "video", "score",
+# "qualitative", "LLM" and "transcript" fields arrive as JSON strings; each is
+# decoded exactly once into a typed, validated object and the generator works
+# from those. orjson is used for decoding when it is installed.
+
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+
+    JSON_BACKEND = "orjson"
+except ImportError:
+    def loads(data):
+        return json.loads(data)
+
+    JSON_BACKEND = "json"
+
+REQUIRED_FIELDS = ("transcript", "audio", "video", "score", "qualitative", "user_name", "LLM")
+QUALITATIVE_SECTIONS = ("Qualitative Analysis", "Quantitative Analysis")
+# Cohort ids are used as file names, so they are restricted to a safe alphabet
+COHORT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+OUTPUT_FORMATS = ("pdf", "html", "json")
+
+
+class PayloadError(ValueError):
+    pass
+
+
+def valid_cohort_id(cohort_id):
+    return isinstance(cohort_id, str) and bool(COHORT_ID_PATTERN.match(cohort_id))
+
+
+def parse_output_format(value):
+    # ?format= or the payload's "format" field; PDF unless asked otherwise
+    if value is None or value == "":
+        return "pdf"
+    if not isinstance(value, str) or value.lower() not in OUTPUT_FORMATS:
+        raise PayloadError(f"Field 'format' must be one of: {', '.join(OUTPUT_FORMATS)}")
+    return value.lower()
+
+
+def _decode(field, raw):
+    # Fields may be sent as JSON strings (the documented contract) or already as JSON values
+    if not isinstance(raw, (str, bytes)):
+        return raw
+    try:
+        return loads(raw)
+    except ValueError as e:
+        raise PayloadError(f"Field '{field}' is not valid JSON: {e}")
+
+
+def _expect_object(field, value):
+    if not isinstance(value, dict):
+        raise PayloadError(f"Field '{field}' must be a JSON object")
+    return value
+
+
+# tabular_data keys the server fills in itself; a client must not be able to
+# print its own cohort standing, back-date the report or replace speech metrics
+RESERVED_METRICS = ("Cohort Percentile", "Cohort Size", "Report Date", "Speech Metrics")
+
+
+class VideoMetrics:
+    __slots__ = ("metrics",)
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    @classmethod
+    def from_raw(cls, raw):
+        metrics = _expect_object("video", _decode("video", raw))
+        for key, value in metrics.items():
+            if key in RESERVED_METRICS:
+                raise PayloadError(f"Video metric '{key}' is reserved")
+            if value is not None and not isinstance(value, (int, float, str)):
+                raise PayloadError(f"Video metric '{key}' must be a number or string")
+        return cls(metrics)
+
+
+class CandidateScores:
+    __slots__ = ("ratings",)
+
+    def __init__(self, ratings):
+        # Insertion order matters: the generator maps ratings to questions by position
+        self.ratings = ratings
+
+    @classmethod
+    def from_raw(cls, raw):
+        ratings = _expect_object("score", _decode("score", raw))
+        for key, value in ratings.items():
+            if not isinstance(value, (int, float, str)) or isinstance(value, bool):
+                raise PayloadError(f"Score '{key}' must be a rating string or a number")
+        return cls(ratings)
+
+
+class QualitativeFeedback:
+    __slots__ = ("data", "positive", "improvement")
+
+    def __init__(self, data):
+        self.data = data
+        self.positive = data.get("Qualitative Analysis", [])
+        self.improvement = data.get("Quantitative Analysis", [])
+
+    @classmethod
+    def from_raw(cls, raw):
+        data = _expect_object("qualitative", _decode("qualitative", raw))
+        for section in QUALITATIVE_SECTIONS:
+            items = data.get(section, [])
+            if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                raise PayloadError(f"Qualitative section '{section}' must be a list of strings")
+        return cls(data)
+
+
+class LLMAnswers:
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def from_raw(cls, raw):
+        text = _decode("LLM", raw)
+        if not isinstance(text, str):
+            raise PayloadError("Field 'LLM' must be a JSON-encoded string of numbered answers")
+        return cls(text)
+
+
+class ReportRequest:
+    __slots__ = ("transcript", "audio", "video", "scores", "qualitative", "llm", "presentation_mode",
+                 "user_name", "cohort", "transcript_appendix", "_raw_presentation_mode")
+
+    def __init__(self, transcript, audio, video, scores, qualitative, llm, presentation_mode, user_name,
+                 cohort=None, transcript_appendix=False):
+        self.transcript = transcript
+        self.audio = audio
+        self.video = video
+        self.scores = scores
+        self.qualitative = qualitative
+        self.llm = llm
+        self._raw_presentation_mode = presentation_mode
+        self.presentation_mode = 'on' if presentation_mode == 'on' else 'off'
+        self.user_name = user_name
+        self.cohort = cohort
+        self.transcript_appendix = transcript_appendix
+
+    def canonical_fields(self):
+        # Decoded field values, as used for the payload cache key
+        return {
+            "transcript": self.transcript,
+            "audio": self.audio,
+            "video": self.video.metrics,
+            "score": self.scores.ratings,
+            "qualitative": self.qualitative.data,
+            "LLM": self.llm.text,
+            "presentation_mode": self._raw_presentation_mode,
+            "user_name": self.user_name,
+            "cohort": self.cohort,
+            "transcript_appendix": self.transcript_appendix or None,
+        }
+
+    def to_candidate(self):
+        # Keyword arguments for create_combined_pdf_buffer and friends
+        tabular_data = dict(self.video.metrics)
+        tabular_data.update({"LLM": self.llm.text, "User Name": self.user_name})
+        candidate = {
+            "tabular_data": tabular_data,
+            "scores_data": self.scores.ratings,
+            "quality_data": self.qualitative.data,
+            "presentation_mode": self.presentation_mode,
+        }
+        if self.transcript_appendix:
+            candidate["transcript"] = self.transcript
+        return candidate
+
+
+def _decode_transcript(raw):
+    # The transcript is not rendered strictly, so anything that is not JSON is kept as text
+    if not isinstance(raw, (str, bytes)):
+        return raw
+    try:
+        return loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_report_request(data):
+    if not isinstance(data, dict):
+        raise PayloadError("Payload must be a JSON object")
+    if not all(data.get(field) for field in REQUIRED_FIELDS):
+        raise PayloadError("Missing required fields")
+    user_name = data["user_name"]
+    if not isinstance(user_name, str):
+        raise PayloadError("Field 'user_name' must be a string")
+    cohort = data.get("cohort")
+    if cohort is not None and not valid_cohort_id(cohort):
+        raise PayloadError("Field 'cohort' must be 1-64 letters, digits, '-' or '_'")
+    transcript_appendix = data.get("transcript_appendix", False)
+    if not isinstance(transcript_appendix, bool):
+        raise PayloadError("Field 'transcript_appendix' must be true or false")
+    return ReportRequest(
+        transcript=_decode_transcript(data["transcript"]),
+        audio=data["audio"],
+        video=VideoMetrics.from_raw(data["video"]),
+        scores=CandidateScores.from_raw(data["score"]),
+        qualitative=QualitativeFeedback.from_raw(data["qualitative"]),
+        llm=LLMAnswers.from_raw(data["LLM"]),
+        presentation_mode=data.get("presentation_mode"),
+        user_name=user_name,
+        cohort=cohort,
+        transcript_appendix=transcript_appendix,
+    )
+
+
+def parse_body(body):
+    # Decode a raw request body; returns None for an empty or non-JSON body
+    if not body:
+        return None
+    try:
+        return loads(body)
+    except ValueError:
+        return None
@@ -0,0 +1,91 @@
+import queue
+import threading
+import time
+import uuid
+
+# In-process job queue for report rendering. Jobs are held in memory, so this
+# only needs the standard library and no external broker.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ReportJob:
+    def __init__(self, func, args, kwargs):
+        self.id = uuid.uuid4().hex
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        info = {"job_id": self.id, "status": self.status}
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class LocalJobQueue:
+    def __init__(self, workers=2, max_queued=32, result_ttl=600):
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"report-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        job = ReportJob(func, args, kwargs)
+        with self._lock:
+            self._expire_finished()
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull("Report queue is full")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _expire_finished(self):
+        # Drop results nobody collected within result_ttl seconds
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            job.status = RUNNING
+            try:
+                job.result = job.func(*job.args, **job.kwargs)
+                job.status = DONE
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+                job.func = job.args = job.kwargs = None
+                self._queue.task_done()
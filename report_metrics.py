@@ -0,0 +1,193 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Minimal in-process metrics with Prometheus text exposition, so the server can
+# be scraped without pulling in a client library. Values are per process.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (8192, 16384, 32768, 65536, 131072, 262144, 524288, 1048576, 4194304)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                       for name, value in pairs)
+    return "{" + escaped + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                                for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        _Metric.__init__(self, name, documentation, labelnames)
+        # A callback gauge is read at scrape time instead of being set
+        self.callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def collect(self):
+        if self.callback is not None:
+            return self.header() + [f"{self.name} {self.callback()}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                                for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        _Metric.__init__(self, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * len(self.buckets), 0.0, 0]
+                self._values[key] = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', bound))} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+_registry = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render_prometheus():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = register(Histogram("report_stage_seconds", "Time spent in each report generation stage.",
+                                   ["stage"]))
+PDF_BYTES = register(Histogram("report_pdf_bytes", "Size of generated PDFs in bytes.", buckets=SIZE_BUCKETS))
+RENDERS_IN_FLIGHT = register(Gauge("report_renders_in_flight", "Reports currently being rendered."))
+RENDERS_IN_FLIGHT.set(0)
+ERRORS = register(Counter("report_errors_total", "Failed report requests.", ["endpoint"]))
+COALESCED_REQUESTS = register(Counter("report_coalesced_requests_total",
+                                      "Report requests answered by another request's render (in_flight) "
+                                      "or by a stored Idempotency-Key outcome (idempotent).", ["reason"]))
+CHART_CACHE_LOOKUPS = register(Counter("report_chart_cache_lookups_total",
+                                       "Score chart cache lookups by result.", ["result"]))
+
+
+def stage(name):
+    return STAGE_SECONDS.time(stage=name)
+
+
+@contextmanager
+def sampled_profile(label, sample_rate, slow_seconds, directory):
+    # Profile a sampled fraction of requests and keep the dump only when the
+    # request turned out slow; load the .prof files with pstats or snakeviz
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this interpreter
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        if elapsed >= slow_seconds:
+            os.makedirs(directory, exist_ok=True)
+            safe_label = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)
+            filename = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{safe_label}_{elapsed:.3f}s.prof"
+            profiler.dump_stats(os.path.join(directory, filename))
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# Versioned storage for saved reports. Every saved report becomes a new version
+# of its candidate instead of overwriting the previous one. Files live under
+# hash-sharded directories named after a digest of the user name, so user
+# input never becomes a path and no directory grows without bound:
+#
+#   <directory>/objects/ab/cd/<candidate key>/000001.pdf
+#
+# A SQLite index records every version, so listing and serving reports never
+# scans directories. A background sweep enforces the retention policy: versions
+# older than max_age are removed, each candidate keeps at most max_versions, and
+# the oldest versions are evicted while the store is over max_bytes (superseded
+# versions before a candidate's latest one).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    candidate_key TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (candidate_key, version)
+);
+CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at);
+"""
+
+
+def candidate_key(user_name):
+    return hashlib.sha256(user_name.encode("utf-8")).hexdigest()
+
+
+def _row_to_dict(row):
+    return {"user_name": row[0], "version": row[1], "size": row[2], "sha256": row[3], "created_at": row[4]}
+
+
+class ReportStore:
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, max_age=30 * 24 * 3600, max_versions=10):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        # One connection shared by all threads; every use holds _lock
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def _relative_path(self, key, version):
+        return os.path.join("objects", key[:2], key[2:4], key, f"{version:06d}.pdf")
+
+    def save(self, user_name, pdf_bytes):
+        # Store pdf_bytes as the candidate's next version and return its index entry
+        key = candidate_key(user_name)
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        with self._lock:
+            row = self._db.execute("SELECT MAX(version) FROM reports WHERE candidate_key = ?", (key,)).fetchone()
+            version = (row[0] or 0) + 1
+            relative_path = self._relative_path(key, version)
+            path = os.path.join(self.directory, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a concurrent reader never sees a half-written file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+            created_at = time.time()
+            self._db.execute("INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, user_name, version, relative_path, len(pdf_bytes), digest, created_at))
+            self._db.commit()
+        return {"user_name": user_name, "version": version, "size": len(pdf_bytes), "sha256": digest,
+                "created_at": created_at}
+
+    def versions(self, user_name):
+        # Index entries for a candidate, newest first
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT user_name, version, size, sha256, created_at FROM reports "
+                "WHERE candidate_key = ? ORDER BY version DESC", (candidate_key(user_name),)).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def load(self, user_name, version=None):
+        # Returns (index entry, pdf bytes) for a version (default: latest), or None
+        key = candidate_key(user_name)
+        with self._lock:
+            if version is None:
+                row = self._db.execute(
+                    "SELECT user_name, version, size, sha256, created_at, path FROM reports "
+                    "WHERE candidate_key = ? ORDER BY version DESC LIMIT 1", (key,)).fetchone()
+            else:
+                row = self._db.execute(
+                    "SELECT user_name, version, size, sha256, created_at, path FROM reports "
+                    "WHERE candidate_key = ? AND version = ?", (key, version)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, row[5]), "rb") as f:
+                return _row_to_dict(row), f.read()
+        except OSError:
+            return None
+
+    def stats(self):
+        with self._lock:
+            reports, total_bytes, candidates = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COUNT(DISTINCT candidate_key) FROM reports").fetchone()
+        return {"reports": reports, "bytes": total_bytes, "candidates": candidates,
+                "max_bytes": self.max_bytes, "max_age": self.max_age, "max_versions": self.max_versions}
+
+    def _delete(self, rows):
+        for key, version, path in rows:
+            try:
+                os.remove(os.path.join(self.directory, path))
+            except OSError:
+                pass
+            self._db.execute("DELETE FROM reports WHERE candidate_key = ? AND version = ?", (key, version))
+            try:
+                # Drop the candidate directory once its last version is gone
+                os.rmdir(os.path.dirname(os.path.join(self.directory, path)))
+            except OSError:
+                pass
+
+    def enforce_retention(self, now=None):
+        # Apply the age, per-candidate and total size limits; returns the number of versions removed
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            if self.max_age > 0:
+                rows = self._db.execute("SELECT candidate_key, version, path FROM reports WHERE created_at < ?",
+                                        (now - self.max_age,)).fetchall()
+                self._delete(rows)
+                removed += len(rows)
+            if self.max_versions > 0:
+                rows = self._db.execute(
+                    "SELECT candidate_key, version, path FROM ("
+                    " SELECT candidate_key, version, path,"
+                    " ROW_NUMBER() OVER (PARTITION BY candidate_key ORDER BY version DESC) AS newest"
+                    " FROM reports) WHERE newest > ?", (self.max_versions,)).fetchall()
+                self._delete(rows)
+                removed += len(rows)
+            if self.max_bytes > 0:
+                total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+                if total_bytes > self.max_bytes:
+                    # Oldest first, but superseded versions go before any candidate's latest one
+                    rows = self._db.execute(
+                        "SELECT candidate_key, version, path, size FROM ("
+                        " SELECT candidate_key, version, path, size, created_at,"
+                        " ROW_NUMBER() OVER (PARTITION BY candidate_key ORDER BY version DESC) AS newest"
+                        " FROM reports) ORDER BY newest = 1, created_at").fetchall()
+                    evicted = []
+                    for key, version, path, size in rows:
+                        if total_bytes <= self.max_bytes:
+                            break
+                        evicted.append((key, version, path))
+                        total_bytes -= size
+                    self._delete(evicted)
+                    removed += len(evicted)
+            self._db.commit()
+        return removed
+
+    def start_retention(self, interval):
+        # Run enforce_retention every interval seconds on a daemon thread
+        if self._sweeper is not None or interval <= 0:
+            return
+
+        def sweep():
+            while not self._stop.wait(interval):
+                try:
+                    removed = self.enforce_retention()
+                    if removed:
+                        print(f"Report retention removed {removed} stored reports")
+                except Exception as e:
+                    print(f"Report retention failed: {e}")
+
+        self._sweeper = threading.Thread(target=sweep, name="report-retention", daemon=True)
+        self._sweeper.start()
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._db.close()
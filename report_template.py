@@ -0,0 +1,190 @@
+import threading
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from report_assets import load_image
+import config
+
+# Everything in a report that does not depend on the candidate: styles, question
+# lists, score mapping, table style and page decorations. Templates are built
+# once per (presentation_mode, branding, output profile) and shared by all
+# reports, so they must be treated as read-only.
+
+DEFAULT_LOGO_PATH = "logos/logo.png"
+DEFAULT_WEBSITE_URL = "https://some.education.in"
+
+PRESENTATION_QUESTIONS = (
+    "Questions",
+    "Level of Confidence through the presentation",
+    "Did the speaker vary their tone, speed, and volume while delivering the speech/presentation?",
+    "Did the speech have a structure of Opening, Body and Conclusion?",
+    "Was the overall \"Objective\" of the speech delivered clearly?",
+    "Was the content of the presentation/speech to the point, or did it include unnecessary details that may have distracted or confused the audience?",
+    "Was the content of the presentation/speech relevant to the objective of the presentation?",
+    "Was the content of the presentation/speech clear and easy to understand?",
+    "Did the speaker keep the presentation engaging by adding relevant examples, anecdotes and data to back their content?",
+    "Did the speaker demonstrate credibility? Will you trust the speaker?",
+    "Did the speaker explain how the speech or topic of the presentation would benefit the audience and what they could gain from it?",
+    "Did the speaker make an emotional connection with the audience?",
+    "Overall, were you convinced/ persuaded with the speaker’s view on the topic?"
+)
+
+INTERVIEW_QUESTIONS = (
+    "Questions",
+    "Level of Confidence through the presentation",
+    "Did the speaker vary their tone, speed, volume?",
+    "Who are you and what are your skills, expertise, personality traits?",
+    "Why are you the best person to fit this role?",
+    "How are you different from others?",
+    "What value do you bring to the role?",
+    "Did the speech have a structure of Opening, Body and Conclusion?",
+    "How was the quality of research for the topic?\nDid the student’s speech demonstrate a good depth?\nDid they cite the sources of research properly?",
+    "How creatively did the student present the video?",
+    "How convinced were you with the overall speech on the topic?\nWas it persuasive?\nWill you give them the job/opportunity?"
+)
+
+# Score mapping for textual ratings to numeric values
+SCORE_MAPPING = {
+    "Excellent": 5,
+    "Good": 4,
+    "Satisfactory": 3,
+    "Needs Improvement": 2,
+    "Poor": 1
+}
+
+# Sub-items of the "Level of Confidence" row: (label, key in the video metrics)
+CONFIDENCE_SUB_ITEMS = (
+    ("Posture", "posture"),
+    ("Smile", "Smile Score"),
+    ("Eye Contact", "Eye Contact"),
+    ("Energy levels through the presentation", "Energy levvels through the presentation")
+)
+
+METRICS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+])
+METRICS_COL_WIDTHS = (40, 250, 80, 200)
+
+
+LOGO_FORM_NAME = "ReportLogo"
+
+
+def make_header_footer(logo_path, website_url=DEFAULT_WEBSITE_URL, image_dpi=None, jpeg_quality=None):
+    logo_size = (2*inch, 1*inch)
+
+    def add_header_footer(canvas, doc):
+        canvas.saveState()
+        # The logo is drawn once per document into a form XObject and every page
+        # references it, so it is embedded once and no page touches the file
+        if not canvas.hasForm(LOGO_FORM_NAME):
+            canvas.beginForm(LOGO_FORM_NAME)
+            canvas.drawImage(load_image(logo_path, logo_size, image_dpi, jpeg_quality),
+                             (letter[0]-2*inch)/2, letter[1]-1.2*inch,
+                             width=logo_size[0], height=logo_size[1], mask='auto')
+            canvas.endForm()
+        canvas.doForm(LOGO_FORM_NAME)
+        canvas.setFont("Helvetica", 9)
+        canvas.linkURL(website_url,
+                       (0.5*inch, 0.3*inch, 2.5*inch, 0.5*inch),
+                       relative=1)
+        canvas.drawString(0.5*inch, 0.3*inch, website_url)
+        # Documents rendered as a later segment of a report continue its page numbering
+        page_num = canvas.getPageNumber() + getattr(doc, 'page_offset', 0)
+        canvas.drawRightString(letter[0]-0.5*inch, 0.3*inch, f"Page {page_num}")
+        canvas.restoreState()
+    return add_header_footer
+
+
+class ReportTemplate:
+    def __init__(self, presentation_mode="off", logo_path=DEFAULT_LOGO_PATH, website_url=DEFAULT_WEBSITE_URL,
+                 profile="standard"):
+        self.presentation_mode = presentation_mode
+        self.logo_path = logo_path
+        self.website_url = website_url
+        self.llm_questions = PRESENTATION_QUESTIONS if presentation_mode == 'on' else INTERVIEW_QUESTIONS
+        self.score_mapping = SCORE_MAPPING
+        self.confidence_sub_items = CONFIDENCE_SUB_ITEMS
+        self.table_style = METRICS_TABLE_STYLE
+        self.table_col_widths = METRICS_COL_WIDTHS
+        self.profile = profile
+        if profile == "compact":
+            # Downsampled logo and a vector chart; the rest is done by pdf_optimize
+            self.image_dpi = config.PDF_IMAGE_DPI
+            self.jpeg_quality = config.PDF_JPEG_QUALITY
+            self.chart_backend = "vector"
+        else:
+            self.image_dpi = None
+            self.jpeg_quality = None
+            self.chart_backend = None
+        self.header_footer = make_header_footer(logo_path, website_url, self.image_dpi, self.jpeg_quality)
+
+        styles = getSampleStyleSheet()
+        styles['BodyText'].fontName = 'Helvetica'
+        self.title_style = styles['Title']
+        self.body_style = styles['BodyText']
+        self.section_style = ParagraphStyle(
+            'SectionStyle',
+            parent=styles['BodyText'],
+            fontName='Helvetica-Bold',
+            fontSize=10,
+            spaceAfter=12,
+            leading=16
+        )
+        self.bullet_style = ParagraphStyle(
+            'BulletStyle',
+            parent=styles['BodyText'],
+            fontSize=10,
+            leading=14,
+            spaceAfter=6,
+            leftIndent=10,
+            bulletIndent=0,
+            firstLineIndent=0
+        )
+        self.iq_style = ParagraphStyle(
+            'IQStyle',
+            parent=styles['BodyText'],
+            fontName='Helvetica-Bold',
+            fontSize=14,      # slightly larger
+            spaceAfter=12
+        )
+        self.normal_style = ParagraphStyle('NormalStyle', parent=styles['BodyText'], fontSize=10, leading=12, spaceAfter=6)
+        self.bold_style = ParagraphStyle('BoldStyle', parent=self.normal_style, fontName='Helvetica-Bold')
+        self.feedback_bullet_style = ParagraphStyle(
+            'FeedbackBulletStyle',
+            parent=self.normal_style,
+            fontSize=10,
+            leading=12,
+            leftIndent=10,
+            bulletIndent=0,
+            spaceAfter=4
+        )
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_report_template(presentation_mode="off", logo_path=DEFAULT_LOGO_PATH, website_url=DEFAULT_WEBSITE_URL,
+                        profile="standard"):
+    presentation_mode = 'on' if presentation_mode == 'on' else 'off'
+    profile = 'compact' if profile == 'compact' else 'standard'
+    key = (presentation_mode, logo_path, website_url, profile)
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                template = ReportTemplate(presentation_mode, logo_path, website_url, profile)
+                _templates[key] = template
+    return template
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Deduplication of report requests. SingleFlight lets concurrent requests for
+# the same payload share one render: the first caller runs it and everyone who
+# arrives while it is in flight waits for and receives the same result (or
+# exception). IdempotencyStore remembers the outcome of requests sent with an
+# Idempotency-Key header, so a client retry inside the window is answered from
+# the stored outcome instead of producing the report again.
+
+# Idempotency-Key values are opaque client tokens (usually UUIDs)
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class IdempotencyMismatch(Exception):
+    # The key was already used for a different request
+    pass
+
+
+def valid_idempotency_key(key):
+    return 0 < len(key) <= MAX_IDEMPOTENCY_KEY_LENGTH and key.isprintable()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> Future of the in-flight call
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, fn, *args, **kwargs):
+        # Returns (result, shared); shared is True when another caller's run was reused
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+
+class IdempotencyStore:
+    # Outcomes are (kind, value, size) tuples chosen by the caller; size counts
+    # towards max_bytes. Entries expire ttl seconds after they were stored and
+    # the least recently used go first when the store is full.
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (created_at, fingerprint, outcome)
+        self._bytes = 0
+        self._flights = SingleFlight()
+
+    def get(self, key, fingerprint):
+        # The stored outcome for key, or None; raises IdempotencyMismatch when the
+        # key was stored for a request with a different fingerprint
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, stored_fingerprint, outcome = entry
+            if time.time() - created_at > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyMismatch(key)
+        return outcome
+
+    def put(self, key, fingerprint, outcome):
+        size = outcome[2]
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # The first outcome stored for a key wins
+            if key in self._entries:
+                return
+            self._entries[key] = (time.time(), fingerprint, outcome)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        _, _, outcome = self._entries.pop(key)
+        self._bytes -= outcome[2]
+
+    def run(self, key, fingerprint, produce, *args):
+        # Returns (outcome, replayed). Retries with the same key and fingerprint
+        # get the stored outcome; concurrent ones wait for the first to finish.
+        # Failed attempts are not stored, so they can be retried.
+        outcome = self.get(key, fingerprint)
+        if outcome is not None:
+            return outcome, True
+        return self._flights.do((key, fingerprint), self._produce, key, fingerprint, produce, args)
+
+    def _produce(self, key, fingerprint, produce, args):
+        # An attempt that finished between get() and joining the flight is not repeated
+        outcome = self.get(key, fingerprint)
+        if outcome is None:
+            outcome = produce(*args)
+            self.put(key, fingerprint, outcome)
+        return outcome
@@ -0,0 +1,111 @@
+from transcript_appendix import iter_segments
+
+# Speech-delivery measurements computed from the transcript's segment timings:
+# speaking rate, how much the rate varies, pauses between segments and filler
+# words. Segments are turned into NumPy arrays once and every statistic is a
+# vectorized operation over them, so a 10k-segment recording takes milliseconds.
+# The report generator imports this module for delivery_lines, so numpy is only
+# imported once a transcript is actually analyzed.
+
+# Filler words and phrases are counted as whole words with str.count over the
+# joined, lower-cased text: punctuation and whitespace become doubled spaces so
+# every word is padded on both sides, even when two fillers are adjacent.
+# Hyphens join words, so "you know-how" is not the filler "you know".
+FILLERS = ("um", "umm", "uh", "uhh", "uhm", "erm", "hmm", "hm", "mm", "mmm", "you know", "i mean")
+_SEPARATORS = str.maketrans({character: " " for character in "\t\r\n.,!?;:\"()[]…"})
+# Gaps between segments from this long count as deliberate pauses
+LONG_PAUSE_SECONDS = 1.0
+# Shorter segments give unreliable per-segment rates and are left out of the rate spread
+MIN_RATE_SECONDS = 1.0
+
+
+def segment_arrays(transcript):
+    # (starts, ends, word counts, texts) for the timed segments, in time order
+    import numpy as np
+    try:
+        # Fast path for a well-formed list of {start, end, text} dicts
+        starts = np.array([segment["start"] for segment in transcript], dtype=float)
+        ends = np.array([segment["end"] for segment in transcript], dtype=float)
+        texts = [segment["text"] for segment in transcript]
+        words = np.fromiter(map(len, map(str.split, texts)), dtype=np.int64, count=len(texts))
+    except (TypeError, KeyError, ValueError):
+        timed = [(start, end, text) for start, end, text in iter_segments(transcript)
+                 if start is not None and end is not None]
+        if not timed:
+            return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64), []
+        starts, ends, texts = zip(*timed)
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        words = np.fromiter(map(len, map(str.split, texts)), dtype=np.int64, count=len(texts))
+    if np.any(starts[1:] < starts[:-1]):
+        order = np.argsort(starts, kind="stable")
+        starts, ends, words, texts = starts[order], ends[order], words[order], [texts[i] for i in order]
+    return starts, ends, words, texts
+
+
+def count_fillers(texts):
+    text = f" {' '.join(texts).lower().translate(_SEPARATORS)} ".replace(" ", "  ")
+    return sum(text.count(f" {'  '.join(filler.split())} ") for filler in FILLERS)
+
+
+def analyze_transcript(transcript):
+    # Returns a dict of delivery metrics, or None when the transcript has no timed speech
+    import numpy as np
+    starts, ends, words, texts = segment_arrays(transcript)
+    durations = np.clip(ends - starts, 0, None)
+    speaking_seconds = float(durations.sum())
+    total_words = int(words.sum())
+    if speaking_seconds <= 0 or total_words == 0:
+        return None
+
+    # Words per minute per segment; the overall rate is the duration-weighted mean
+    rated = durations >= MIN_RATE_SECONDS
+    rates = words[rated] / durations[rated] * 60
+    overall_wpm = total_words / speaking_seconds * 60
+    if rates.size:
+        weights = durations[rated]
+        rate_std = float(np.sqrt(np.average((rates - overall_wpm) ** 2, weights=weights)))
+        rate_p10, rate_p90 = np.percentile(rates, [10, 90])
+    else:
+        rate_std = 0.0
+        rate_p10 = rate_p90 = overall_wpm
+
+    # Gaps between consecutive segments; overlaps count as no pause
+    pauses = np.clip(starts[1:] - ends[:-1], 0, None)
+    long_pauses = pauses[pauses >= LONG_PAUSE_SECONDS]
+
+    fillers = count_fillers(texts)
+    minutes = (float(ends.max() - starts.min()) or speaking_seconds) / 60
+
+    return {
+        "segments": int(starts.size),
+        "words": total_words,
+        "speaking_seconds": round(speaking_seconds, 1),
+        "wpm": round(overall_wpm, 1),
+        "wpm_p10": round(float(rate_p10), 1),
+        "wpm_p90": round(float(rate_p90), 1),
+        "wpm_std": round(rate_std, 1),
+        # Coefficient of variation of the speaking rate, in percent
+        "pace_variation": round(rate_std / overall_wpm * 100, 1),
+        "pauses": int(long_pauses.size),
+        "pauses_per_minute": round(long_pauses.size / minutes, 2) if minutes > 0 else 0.0,
+        "pause_median": round(float(np.median(long_pauses)), 2) if long_pauses.size else 0.0,
+        "pause_p90": round(float(np.percentile(long_pauses, 90)), 2) if long_pauses.size else 0.0,
+        "pause_max": round(float(pauses.max()), 2) if pauses.size else 0.0,
+        "fillers": fillers,
+        "fillers_per_100_words": round(fillers / total_words * 100, 2),
+        "fillers_per_minute": round(fillers / minutes, 2) if minutes > 0 else 0.0,
+    }
+
+
+def delivery_lines(metrics):
+    # Feedback lines for the Detailed Evaluation Metrics table
+    return [
+        f"Speaking rate: {metrics['wpm']:.0f} words/min "
+        f"(most segments {metrics['wpm_p10']:.0f}-{metrics['wpm_p90']:.0f})",
+        f"Pace variation: {metrics['pace_variation']:.0f}% (std {metrics['wpm_std']:.0f} words/min)",
+        f"Pauses over {LONG_PAUSE_SECONDS:g}s: {metrics['pauses']} "
+        f"({metrics['pauses_per_minute']:.1f}/min, median {metrics['pause_median']:.1f}s, "
+        f"longest {metrics['pause_max']:.1f}s)",
+        f"Filler words: {metrics['fillers']} ({metrics['fillers_per_100_words']:.1f} per 100 words)",
+    ]
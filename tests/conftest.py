@@ -0,0 +1,23 @@
+import os
+import sys
+import pytest
+
+# The server modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch, clock_module):
+    # Test files name the module whose time.time() they control with a
+    # clock_module fixture
+    clock = FakeClock()
+    monkeypatch.setattr(clock_module.time, "time", clock.time)
+    return clock
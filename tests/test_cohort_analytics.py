@@ -0,0 +1,98 @@
+import os
+import pytest
+from cohort_analytics import Cohort, CohortStore, influence_quotient, percentile_ranks
+
+
+def scores(*ratings):
+    return {f"q{i}": rating for i, rating in enumerate(ratings)}
+
+
+def test_influence_quotient():
+    # Mapped rating points over 5 per score entry; unmapped scores count as 0 points
+    assert influence_quotient(scores("Excellent", "Good", "Poor")) == 67.0
+    assert influence_quotient(scores("Excellent", "Good", 3)) == 60.0
+    assert influence_quotient({}) == 0.0
+    # 23 of 40 points, rounded like round() in the report
+    assert influence_quotient(scores("Excellent", "Good", "Good", "Good", "Satisfactory", "Poor",
+                                     "Poor", "Poor")) == 57.0
+
+
+def test_percentile_ranks_count_ties_as_half():
+    population = [10, 20, 20, 30]
+    assert list(percentile_ranks([20, 5, 30, 40], population)) == [50.0, 0.0, 87.5, 100.0]
+
+
+def make_cohort():
+    cohort = Cohort("c")
+    cohort.add("low", scores("Poor", "Poor"), {})
+    cohort.add("mid", scores("Satisfactory", "Satisfactory"), {})
+    cohort.add("high", scores("Excellent", "Excellent"), {})
+    return cohort
+
+
+def test_percentile_of_members():
+    cohort = make_cohort()
+    percentiles = [cohort.percentile_of(name) for name in ("low", "mid", "high")]
+    assert percentiles == pytest.approx([100 / 6, 50, 500 / 6])
+
+
+def test_standing_with_matches_recording_the_candidate():
+    cohort = make_cohort()
+    entry = (scores("Good", "Good"), {"Eye Contact": 4})
+    # 80 against 20, 60 and 100
+    assert cohort.standing_with("new", *entry) == (62.5, 4)
+    # Nothing was recorded
+    assert len(cohort) == 3
+    cohort.add("new", *entry)
+    assert cohort.standing_with("new", *entry) == (cohort.percentile_of("new"), 4)
+
+
+def test_standing_with_replaces_the_previous_entry():
+    cohort = make_cohort()
+    # "low" resubmits with the top rating: its old entry no longer counts, and
+    # it ties with "high"
+    percentile, size = cohort.standing_with("low", scores("Excellent", "Excellent"), {})
+    assert size == 3
+    cohort.add("low", scores("Excellent", "Excellent"), {})
+    assert percentile == pytest.approx(cohort.percentile_of("low")) == pytest.approx(200 / 3)
+    assert len(cohort) == 3
+
+
+def test_summary():
+    cohort = make_cohort()
+    cohort.add("extra", scores("Good"), {"Eye Contact": 3.5})
+    summary = cohort.summary()
+    assert summary["size"] == 4
+    quotient = summary["influence_quotient"]
+    assert quotient["mean"] == pytest.approx((20 + 60 + 100 + 80) / 4)
+    assert (quotient["min"], quotient["median"], quotient["max"]) == (20.0, 70.0, 100.0)
+    assert quotient["histogram"]["20-30"] == 1
+    assert sum(quotient["histogram"].values()) == 4
+
+    q0 = summary["parameters"]["q0"]
+    assert q0["count"] == 4
+    assert q0["mean"] == pytest.approx(3.25)
+    assert q0["distribution"] == {"1": 1, "2": 0, "3": 1, "4": 1, "5": 1}
+    assert summary["parameters"]["q1"]["count"] == 3
+    assert summary["parameters"]["Eye Contact"] == {"count": 1, "mean": 3.5, "std": 0.0,
+                                                    "distribution": {str(level): 0 for level in range(1, 6)}}
+
+
+def test_empty_cohort_summary():
+    assert Cohort("c").summary() == {"cohort_id": "c", "size": 0}
+
+
+def test_store_appends_once_and_reloads(tmp_path):
+    store = CohortStore(str(tmp_path))
+    entry = (scores("Good", "Poor"), {"Smile Score": 2})
+    store.add("c", "alice", *entry)
+    store.add("c", "alice", *entry)
+    store.add("c", "bob", scores("Excellent", "Excellent"), {})
+    # The standing is computed without writing anything
+    assert store.standing("c", "carol", scores("Poor", "Poor"), {}) == (pytest.approx(100 / 6), 3)
+    with open(os.path.join(str(tmp_path), "c.jsonl")) as f:
+        assert len(f.readlines()) == 2
+
+    reloaded = CohortStore(str(tmp_path))
+    assert reloaded.summary("c") == store.summary("c")
+    assert reloaded.percentile("c", "alice") == (25.0, 2)
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+import pytest
+import render_scheduler
+from render_scheduler import BULK, INTERACTIVE, FairScheduler, Throttled
+
+
+def queued(scheduler):
+    return sum(scheduler.stats()["queued"].values())
+
+
+def queue_renders(scheduler, renders, order):
+    # Starts one thread per (tenant, priority), each queued before the next
+    # starts; a thread records its tenant when it gets a slot
+    def render(tenant, priority):
+        with scheduler.slot(tenant, priority):
+            order.append((tenant, priority))
+
+    threads = []
+    for tenant, priority in renders:
+        before = queued(scheduler)
+        thread = threading.Thread(target=render, args=(tenant, priority))
+        thread.start()
+        deadline = time.monotonic() + 5
+        while queued(scheduler) == before and time.monotonic() < deadline:
+            time.sleep(0.001)
+        threads.append(thread)
+    return threads
+
+
+def run_queued(scheduler, renders):
+    # Queues renders behind a held slot, then lets them through one at a time
+    order = []
+    with scheduler.slot("holder"):
+        threads = queue_renders(scheduler, renders, order)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+def test_busy_tenant_does_not_delay_others():
+    scheduler = FairScheduler(slots=1, rate=0)
+    renders = [("bigco", INTERACTIVE)] * 4 + [("small", INTERACTIVE)]
+    order = run_queued(scheduler, renders)
+    # small queued last but only waits for bigco's first render
+    assert [tenant for tenant, _ in order] == ["bigco", "small", "bigco", "bigco", "bigco"]
+
+
+def test_interactive_renders_go_before_bulk():
+    scheduler = FairScheduler(slots=1, rate=0)
+    renders = [("a", BULK)] * 3 + [("b", INTERACTIVE)] * 3
+    order = run_queued(scheduler, renders)
+    assert order == [("b", INTERACTIVE)] * 3 + [("a", BULK)] * 3
+
+
+def test_bulk_gets_its_weighted_share():
+    scheduler = FairScheduler(slots=1, rate=0, weights={INTERACTIVE: 2, BULK: 1})
+    renders = [("a", BULK)] * 2 + [("b", INTERACTIVE)] * 4
+    order = run_queued(scheduler, renders)
+    # Two interactive renders for each bulk one; ties go to the earlier arrival
+    assert [priority for _, priority in order] == [INTERACTIVE, BULK, INTERACTIVE, INTERACTIVE, BULK,
+                                                   INTERACTIVE]
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    scheduler = FairScheduler(slots=1, rate=0, max_queued=2)
+    order = []
+    with scheduler.slot("holder"):
+        threads = queue_renders(scheduler, [("a", INTERACTIVE), ("b", INTERACTIVE)], order)
+        with pytest.raises(Throttled) as rejected:
+            with scheduler.slot("c"):
+                pass
+    for thread in threads:
+        thread.join(5)
+    assert rejected.value.reason == "queue_full"
+    # Two renders ahead on one slot, plus this one, at the initial 1s estimate
+    assert rejected.value.retry_after == 3
+    assert scheduler.stats()["rejected"] == {"queue_full": 1}
+
+
+def test_tenant_queue_limit():
+    scheduler = FairScheduler(slots=1, rate=0, max_queued_per_tenant=1)
+    order = []
+    with scheduler.slot("holder"):
+        threads = queue_renders(scheduler, [("a", INTERACTIVE)], order)
+        with pytest.raises(Throttled) as rejected:
+            with scheduler.slot("a"):
+                pass
+        # Other tenants still get in line
+        threads += queue_renders(scheduler, [("b", INTERACTIVE)], order)
+    for thread in threads:
+        thread.join(5)
+    assert rejected.value.reason == "tenant_queue_full"
+    assert rejected.value.retry_after == 2
+    assert order == [("a", INTERACTIVE), ("b", INTERACTIVE)]
+
+
+def test_wait_timeout_leaves_the_queue():
+    scheduler = FairScheduler(slots=1, rate=0, max_wait=0.05)
+    with scheduler.slot("holder"):
+        with pytest.raises(Throttled) as rejected:
+            with scheduler.slot("a"):
+                pass
+        assert queued(scheduler) == 0
+    assert rejected.value.reason == "wait_timeout"
+    assert rejected.value.retry_after == 1
+    # The slot is free again afterwards
+    with scheduler.slot("a"):
+        assert scheduler.stats()["running"][INTERACTIVE] == 1
+
+
+def test_rate_limit(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(render_scheduler.time, "monotonic", lambda: now[0])
+    scheduler = FairScheduler(rate=0.5, burst=2)
+    scheduler.admit("a")
+    scheduler.admit("a")
+    with pytest.raises(Throttled) as rejected:
+        scheduler.admit("a")
+    assert rejected.value.reason == "rate_limited"
+    # One token every 2 seconds
+    assert rejected.value.retry_after == 2
+    # Other tenants have their own bucket
+    scheduler.admit("b")
+    now[0] += 2
+    scheduler.admit("a")
+
+
+def test_async_slot_waits_in_fair_order():
+    scheduler = FairScheduler(slots=1, rate=0)
+
+    async def render(tenant, order):
+        async with scheduler.async_slot(tenant):
+            order.append(tenant)
+            await asyncio.sleep(0)
+
+    async def main():
+        order = []
+        async with scheduler.async_slot("holder"):
+            tasks = [asyncio.create_task(render(tenant, order)) for tenant in ["bigco"] * 3 + ["small"]]
+            await asyncio.sleep(0.01)
+            assert queued(scheduler) == 4
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["bigco", "small", "bigco", "bigco"]
+
+
+def test_async_slot_timeout_and_cancel():
+    scheduler = FairScheduler(slots=1, rate=0)
+
+    async def main():
+        async with scheduler.async_slot("holder"):
+            with pytest.raises(Throttled) as rejected:
+                async with scheduler.async_slot("a", max_wait=0.05):
+                    pass
+            waiting = asyncio.create_task(scheduler.async_slot("b").__aenter__())
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            assert queued(scheduler) == 0
+        return rejected.value
+
+    assert asyncio.run(main()).reason == "wait_timeout"
+    assert scheduler.stats()["running"] == {INTERACTIVE: 0, BULK: 0}
@@ -0,0 +1,89 @@
+import json
+import os
+import pytest
+import report_cache
+from report_cache import CACHE_KEY_FIELDS, ReportCache, canonical_cache_key, payload_cache_key
+
+
+@pytest.fixture
+def clock_module():
+    return report_cache
+
+
+def test_memory_entries_are_evicted_least_recently_used(clock):
+    cache = ReportCache(max_bytes=25)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    cache.get("a")
+    cache.put("c", b"c" * 10)
+    assert cache.get("a") == b"a" * 10
+    assert cache.get("b") is None
+    assert cache.get("c") == b"c" * 10
+    # A PDF larger than the whole cache is never kept
+    cache.put("big", b"x" * 26)
+    assert cache.get("big") is None
+
+
+def test_memory_entries_expire(clock):
+    cache = ReportCache(ttl=60)
+    cache.put("a", b"pdf")
+    clock.now += 60
+    assert cache.get("a") == b"pdf"
+    clock.now += 1
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_a_restart_and_refills_memory(tmp_path, clock):
+    cache = ReportCache(max_bytes=10, directory=str(tmp_path))
+    cache.put("aa01", b"a" * 8)
+    cache.put("bb02", b"b" * 8)
+    # Only the newest fits in memory; the older one is read back from disk
+    assert cache.get("aa01") == b"a" * 8
+
+    reloaded = ReportCache(max_bytes=10, directory=str(tmp_path))
+    assert reloaded.get("bb02") == b"b" * 8
+    assert reloaded.get("missing") is None
+
+
+def test_disk_entries_expire_by_file_age(tmp_path, clock):
+    cache = ReportCache(max_bytes=0, ttl=60, directory=str(tmp_path))
+    cache.put("aa01", b"pdf")
+    path = os.path.join(str(tmp_path), "aa", "aa01.pdf")
+    os.utime(path, (clock.now - 61, clock.now - 61))
+    assert cache.get("aa01") is None
+    assert not os.path.exists(path)
+
+
+def test_disk_limit_removes_oldest_files(tmp_path, clock):
+    cache = ReportCache(max_bytes=0, directory=str(tmp_path), disk_max_bytes=20)
+    for key in ("aa01", "bb02", "cc03"):
+        cache.put(key, b"x" * 8)
+    assert not os.path.exists(os.path.join(str(tmp_path), "aa", "aa01.pdf"))
+    assert cache.get("aa01") is None
+    assert cache.get("bb02") == cache.get("cc03") == b"x" * 8
+
+
+def test_disk_entries_use_the_configured_suffix(tmp_path, clock):
+    cache = ReportCache(directory=str(tmp_path), suffix=".docx")
+    cache.put("aa01", b"doc")
+    assert os.listdir(os.path.join(str(tmp_path), "aa")) == ["aa01.docx"]
+    assert ReportCache(directory=str(tmp_path), suffix=".pdf").get("aa01") is None
+
+
+def test_payload_key_ignores_json_formatting():
+    scores = {"Clarity": "Good", "Pace": "Poor"}
+    compact = {"user_name": "alice", "score": json.dumps(scores, separators=(",", ":"))}
+    spaced = {"user_name": "alice", "score": json.dumps(dict(reversed(list(scores.items()))), indent=2),
+              "unrelated": "ignored"}
+    assert payload_cache_key(compact, "01 May 2025") == payload_cache_key(spaced, "01 May 2025")
+    # The decoded fields give the same key as the raw payload
+    assert canonical_cache_key({"user_name": "alice", "score": scores}, "01 May 2025") == \
+        payload_cache_key(compact, "01 May 2025")
+
+
+def test_key_changes_with_content_and_date():
+    base = {field: None for field in CACHE_KEY_FIELDS}
+    key = canonical_cache_key(dict(base, user_name="alice"), "01 May 2025")
+    assert canonical_cache_key(dict(base, user_name="bob"), "01 May 2025") != key
+    assert canonical_cache_key(dict(base, user_name="alice"), "02 May 2025") != key
+    assert canonical_cache_key(dict(base, user_name="alice", pdf_profile="compact"), "01 May 2025") != key
@@ -0,0 +1,113 @@
+import json
+import pytest
+from report_ingest import PayloadError, parse_body, parse_output_format, parse_report_request, valid_cohort_id
+
+
+def payload(**fields):
+    data = {
+        "transcript": json.dumps([{"start": 0.0, "end": 2.0, "text": "Hello there"}]),
+        "audio": "audio.wav",
+        "video": json.dumps({"Eye Contact": 4, "Smile Score": "High"}),
+        "score": json.dumps({"Clarity": "Good", "Pace": 3}),
+        "qualitative": json.dumps({"Qualitative Analysis": ["Clear"], "Quantitative Analysis": ["Slow down"]}),
+        "LLM": json.dumps("1. First answer"),
+        "user_name": "alice",
+    }
+    data.update(fields)
+    return data
+
+
+def test_valid_payload_is_decoded_once_into_a_candidate():
+    request = parse_report_request(payload(presentation_mode="on", cohort="team-1"))
+    assert request.scores.ratings == {"Clarity": "Good", "Pace": 3}
+    assert request.qualitative.positive == ["Clear"]
+    assert request.qualitative.improvement == ["Slow down"]
+    assert request.transcript == [{"start": 0.0, "end": 2.0, "text": "Hello there"}]
+    candidate = request.to_candidate()
+    assert candidate["tabular_data"] == {"Eye Contact": 4, "Smile Score": "High", "LLM": "1. First answer",
+                                         "User Name": "alice"}
+    assert candidate["presentation_mode"] == "on"
+    assert "transcript" not in candidate
+
+
+def test_fields_may_already_be_decoded():
+    video = {"Eye Contact": 4, "Smile Score": "High"}
+    decoded = parse_report_request(payload(score={"Clarity": "Good", "Pace": 3}, video=video))
+    assert decoded.canonical_fields() == parse_report_request(payload()).canonical_fields()
+
+
+def test_transcript_that_is_not_json_is_kept_as_text():
+    assert parse_report_request(payload(transcript="plain words")).transcript == "plain words"
+
+
+def test_transcript_appendix_adds_the_transcript_to_the_candidate():
+    request = parse_report_request(payload(transcript_appendix=True))
+    assert request.to_candidate()["transcript"] == request.transcript
+    with pytest.raises(PayloadError, match="transcript_appendix"):
+        parse_report_request(payload(transcript_appendix="yes"))
+
+
+@pytest.mark.parametrize("data", [None, [], "text"])
+def test_payload_must_be_an_object(data):
+    with pytest.raises(PayloadError, match="JSON object"):
+        parse_report_request(data)
+
+
+@pytest.mark.parametrize("field", ["transcript", "audio", "video", "score", "qualitative", "user_name", "LLM"])
+def test_missing_or_empty_required_field(field):
+    data = payload()
+    del data[field]
+    with pytest.raises(PayloadError, match="Missing required fields"):
+        parse_report_request(data)
+    with pytest.raises(PayloadError, match="Missing required fields"):
+        parse_report_request(payload(**{field: ""}))
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"score": "{not json"}, "Field 'score' is not valid JSON"),
+    ({"video": json.dumps([1, 2])}, "Field 'video' must be a JSON object"),
+    ({"score": json.dumps({"Clarity": True})}, "Score 'Clarity' must be a rating string or a number"),
+    ({"score": json.dumps({"Clarity": ["Good"]})}, "Score 'Clarity' must be a rating string or a number"),
+    ({"video": json.dumps({"Eye Contact": {"value": 4}})}, "Video metric 'Eye Contact' must be a number or string"),
+    ({"qualitative": json.dumps({"Qualitative Analysis": "Clear"})},
+     "Qualitative section 'Qualitative Analysis' must be a list of strings"),
+    ({"LLM": json.dumps({"1": "answer"})}, "Field 'LLM' must be a JSON-encoded string"),
+    ({"user_name": 7}, "Field 'user_name' must be a string"),
+])
+def test_invalid_fields(fields, message):
+    with pytest.raises(PayloadError, match=message):
+        parse_report_request(payload(**fields))
+
+
+@pytest.mark.parametrize("metric", ["Cohort Percentile", "Cohort Size", "Report Date", "Speech Metrics"])
+def test_reserved_video_metrics_are_rejected(metric):
+    with pytest.raises(PayloadError, match=f"Video metric '{metric}' is reserved"):
+        parse_report_request(payload(video=json.dumps({metric: 99})))
+
+
+@pytest.mark.parametrize("cohort", ["../etc", "a b", "", "x" * 65, 12])
+def test_invalid_cohort_id(cohort):
+    assert not valid_cohort_id(cohort)
+    with pytest.raises(PayloadError, match="Field 'cohort'"):
+        parse_report_request(payload(cohort=cohort))
+
+
+def test_valid_cohort_id():
+    assert valid_cohort_id("Team_2025-a")
+    assert valid_cohort_id("x" * 64)
+
+
+def test_output_format():
+    assert parse_output_format(None) == "pdf"
+    assert parse_output_format("") == "pdf"
+    assert parse_output_format("HTML") == "html"
+    assert parse_output_format("json") == "json"
+    for value in ("docx", 1):
+        with pytest.raises(PayloadError, match="Field 'format' must be one of: pdf, html, json"):
+            parse_output_format(value)
+
+
+def test_parse_body():
+    assert parse_body(b'{"user_name": "alice"}') == {"user_name": "alice"}
+    assert parse_body(b"") is None
+    assert parse_body(b"{not json") is None
@@ -0,0 +1,90 @@
+import os
+import pytest
+import report_store
+from report_store import ReportStore
+
+
+@pytest.fixture
+def clock_module():
+    return report_store
+
+
+def make_store(tmp_path, **limits):
+    limits.setdefault("max_bytes", 0)
+    limits.setdefault("max_age", 0)
+    limits.setdefault("max_versions", 0)
+    return ReportStore(str(tmp_path), **limits)
+
+
+def save_at(store, clock, when, user_name, size=100):
+    clock.now = when
+    return store.save(user_name, b"%" * size)
+
+
+def remaining(store, user_name):
+    return [entry["version"] for entry in store.versions(user_name)]
+
+
+def test_age_limit_removes_only_expired_versions(tmp_path, clock):
+    store = make_store(tmp_path, max_age=100)
+    save_at(store, clock, 1000, "alice")
+    save_at(store, clock, 1050, "alice")
+    save_at(store, clock, 1080, "bob")
+
+    assert store.enforce_retention(now=1120) == 1
+    assert remaining(store, "alice") == [2]
+    assert remaining(store, "bob") == [1]
+    assert store.load("alice", 1) is None
+
+    assert store.enforce_retention(now=1200) == 2
+    assert store.stats()["reports"] == 0
+
+
+def test_version_limit_keeps_newest_per_candidate(tmp_path, clock):
+    store = make_store(tmp_path, max_versions=2)
+    for when in (1000, 1001, 1002, 1003):
+        save_at(store, clock, when, "alice")
+    save_at(store, clock, 1004, "bob")
+
+    assert store.enforce_retention() == 2
+    assert remaining(store, "alice") == [4, 3]
+    assert remaining(store, "bob") == [1]
+
+
+def test_size_limit_evicts_superseded_versions_before_latest(tmp_path, clock):
+    store = make_store(tmp_path, max_bytes=250)
+    # bob's only report is the oldest, but it is his latest, so alice's
+    # superseded first version goes first
+    save_at(store, clock, 1000, "bob")
+    save_at(store, clock, 1001, "alice")
+    save_at(store, clock, 1002, "alice")
+
+    assert store.enforce_retention() == 1
+    assert remaining(store, "alice") == [2]
+    assert remaining(store, "bob") == [1]
+
+    # Once only latest versions are left they go oldest first
+    store.max_bytes = 150
+    assert store.enforce_retention() == 1
+    assert remaining(store, "bob") == []
+    assert remaining(store, "alice") == [2]
+    assert store.stats()["bytes"] == 100
+
+
+def test_retention_deletes_files_and_empty_candidate_directories(tmp_path, clock):
+    store = make_store(tmp_path, max_age=10)
+    save_at(store, clock, 1000, "alice")
+    key = report_store.candidate_key("alice")
+    candidate_dir = os.path.join(str(tmp_path), "objects", key[:2], key[2:4], key)
+    assert os.listdir(candidate_dir) == ["000001.pdf"]
+
+    store.enforce_retention(now=2000)
+    assert not os.path.exists(candidate_dir)
+
+
+def test_limits_of_zero_keep_everything(tmp_path, clock):
+    store = make_store(tmp_path)
+    for when in range(5):
+        save_at(store, clock, 1000 + when, "alice")
+    assert store.enforce_retention(now=10 ** 9) == 0
+    assert remaining(store, "alice") == [5, 4, 3, 2, 1]
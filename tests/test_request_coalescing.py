@@ -0,0 +1,155 @@
+import threading
+import pytest
+import request_coalescing
+from request_coalescing import IdempotencyMismatch, IdempotencyStore, SingleFlight
+
+
+class Gate:
+    # A function that blocks until released, counting how often it ran
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.entered.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def join_flight(count, target):
+    # Starts count threads calling target while the leader is still running,
+    # and gives them a moment to start waiting on its flight
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    threading.Event().wait(0.1)
+    return threads
+
+
+def test_single_flight_shares_one_result():
+    flights = SingleFlight()
+    gate = Gate(result=object())
+    leader = threading.Thread(target=lambda: flights.do("key", gate))
+    leader.start()
+    gate.entered.wait(5)
+    results = []
+    followers = join_flight(4, lambda: results.append(flights.do("key", gate)))
+    gate.release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert gate.calls == 1
+    assert results == [(gate.result, True)] * 4
+
+
+def test_single_flight_leader_is_not_shared_and_key_is_released():
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+
+
+def test_single_flight_shares_one_exception():
+    flights = SingleFlight()
+    error = ValueError("render failed")
+    gate = Gate(error=error)
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(flights.do("key", gate))
+        except ValueError as e:
+            outcomes.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    gate.entered.wait(5)
+    followers = join_flight(3, call)
+    gate.release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert gate.calls == 1
+    assert outcomes == [error] * 4
+    # The failed flight is gone, so the next call runs again
+    assert flights.do("key", lambda: "retried") == ("retried", False)
+
+
+@pytest.fixture
+def clock_module():
+    return request_coalescing
+
+
+def test_idempotency_replays_stored_outcome(clock):
+    store = IdempotencyStore()
+    calls = []
+
+    def produce(name):
+        calls.append(name)
+        return ("pdf", name, 10)
+
+    assert store.run("key-1", "fp", produce, "alice") == (("pdf", "alice", 10), False)
+    assert store.run("key-1", "fp", produce, "alice") == (("pdf", "alice", 10), True)
+    assert calls == ["alice"]
+
+
+def test_idempotency_key_reused_for_different_request(clock):
+    store = IdempotencyStore()
+    store.run("key-1", "fp-alice", lambda: ("pdf", "alice", 10))
+    with pytest.raises(IdempotencyMismatch):
+        store.run("key-1", "fp-bob", lambda: ("pdf", "bob", 10))
+    # The original request still replays
+    assert store.run("key-1", "fp-alice", lambda: ("pdf", "other", 10)) == (("pdf", "alice", 10), True)
+
+
+def test_idempotency_failed_attempt_is_not_stored(clock):
+    store = IdempotencyStore()
+
+    def fail():
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        store.run("key-1", "fp", fail)
+    assert store.run("key-1", "fp", lambda: ("pdf", "ok", 10)) == (("pdf", "ok", 10), False)
+
+
+def test_idempotency_entries_expire(clock):
+    store = IdempotencyStore(ttl=60)
+    store.run("key-1", "fp", lambda: ("pdf", "first", 10))
+    clock.now += 61
+    # After the window the key is free again, even for a different request
+    assert store.run("key-1", "fp-other", lambda: ("pdf", "second", 10)) == (("pdf", "second", 10), False)
+
+
+def test_idempotency_evicts_least_recently_used(clock):
+    store = IdempotencyStore(max_bytes=25)
+    store.run("a", "fp", lambda: ("pdf", "a", 10))
+    store.run("b", "fp", lambda: ("pdf", "b", 10))
+    store.get("a", "fp")
+    store.run("c", "fp", lambda: ("pdf", "c", 10))
+    assert store.get("a", "fp") == ("pdf", "a", 10)
+    assert store.get("b", "fp") is None
+    # An outcome larger than the whole store is never kept
+    store.run("big", "fp", lambda: ("pdf", "big", 26))
+    assert store.get("big", "fp") is None
+
+
+def test_idempotency_concurrent_retries_run_once(clock):
+    store = IdempotencyStore()
+    gate = Gate(result=("pdf", "alice", 10))
+    leader = threading.Thread(target=lambda: store.run("key-1", "fp", gate))
+    leader.start()
+    gate.entered.wait(5)
+    results = []
+    followers = join_flight(3, lambda: results.append(store.run("key-1", "fp", gate)))
+    gate.release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert gate.calls == 1
+    assert results == [(("pdf", "alice", 10), True)] * 3
@@ -0,0 +1,60 @@
+import pytest
+from speech_metrics import analyze_transcript, count_fillers, delivery_lines
+
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+
+def test_fillers_are_counted_as_whole_words():
+    assert count_fillers(["Um, so I think, uh, you know."]) == 3
+    # Adjacent fillers are both counted
+    assert count_fillers(["um um"]) == 2
+    # Fillers inside other words or joined by hyphens are not
+    assert count_fillers(["The umbrella was humming."]) == 0
+    assert count_fillers(["You know-how matters."]) == 0
+    assert count_fillers(["You know, I mean it."]) == 2
+
+
+def test_rates_and_pauses():
+    transcript = [
+        segment(0.0, 6.0, "one two three four five six seven eight nine ten"),
+        segment(6.5, 12.5, "one two three four five six seven eight nine ten"),
+        # Starts 3 seconds after the previous segment ends: one long pause
+        segment(15.5, 21.5, "one two three four five six seven eight nine ten um"),
+    ]
+    metrics = analyze_transcript(transcript)
+    assert metrics["segments"] == 3
+    assert metrics["words"] == 31
+    assert metrics["speaking_seconds"] == 18.0
+    assert metrics["wpm"] == pytest.approx(31 / 18 * 60, abs=0.05)
+    assert metrics["wpm_p10"] == 100.0
+    assert metrics["wpm_p90"] == pytest.approx(108.0, abs=0.05)
+    assert metrics["pauses"] == 1
+    assert metrics["pause_max"] == 3.0
+    assert metrics["pause_median"] == 3.0
+    assert metrics["fillers"] == 1
+    assert metrics["fillers_per_100_words"] == pytest.approx(100 / 31, abs=0.005)
+
+
+def test_segments_out_of_order_and_untimed():
+    in_order = analyze_transcript([segment(0.0, 4.0, "a b c d"), segment(6.0, 10.0, "e f g h")])
+    shuffled = analyze_transcript([segment(6.0, 10.0, "e f g h"), segment(0.0, 4.0, "a b c d")])
+    assert shuffled == in_order
+    assert in_order["pauses"] == 1
+    # Segments without timings are skipped rather than failing the analysis
+    mixed = analyze_transcript([segment(0.0, 4.0, "a b c d"), {"text": "no timing"}, segment(6.0, 10.0, "e f g h")])
+    assert mixed == in_order
+
+
+def test_no_timed_speech():
+    assert analyze_transcript([]) is None
+    assert analyze_transcript("plain text transcript") is None
+    assert analyze_transcript([segment(1.0, 1.0, "instant")]) is None
+
+
+def test_delivery_lines():
+    metrics = analyze_transcript([segment(0.0, 4.0, "a b c d um"), segment(6.0, 10.0, "e f g h")])
+    lines = delivery_lines(metrics)
+    assert len(lines) == 4
+    assert lines[-1] == "Filler words: 1 (11.1 per 100 words)"
@@ -0,0 +1,120 @@
+from html import escape
+from reportlab.platypus import PageBreak, Paragraph, Spacer
+import config
+
+# Optional timestamped transcript appendix. Long recordings have thousands of
+# segments, so the appendix is produced by generators, one flowable per
+# segment, and fed to ReportLab through StreamedFlowables: only a small window
+# of paragraphs exists at any time instead of one per segment for the whole
+# recording. Past max_segments the rest of the recording is summarized in a
+# single line instead of being printed.
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def iter_segments(transcript):
+    # Yields (start, end, text) from the transcript's {start, end, text} segments.
+    # A plain-text transcript is a single untimed segment; malformed entries are skipped.
+    if isinstance(transcript, str):
+        if transcript.strip():
+            yield None, None, transcript.strip()
+        return
+    if not isinstance(transcript, list):
+        return
+    for segment in transcript:
+        if not isinstance(segment, dict):
+            continue
+        text = segment.get("text")
+        if not isinstance(text, str) or not text.strip():
+            continue
+        start = segment.get("start")
+        end = segment.get("end")
+        if not isinstance(start, (int, float)) or isinstance(start, bool):
+            start = None
+        if not isinstance(end, (int, float)) or isinstance(end, bool):
+            end = None
+        yield start, end, text.strip()
+
+
+def capped_segments(transcript, max_segments=None, max_chars=None):
+    # Yields ("segment", start, end, text) for up to max_segments segments (0: no
+    # cap), then one ("omitted", first start, last end, count) for the rest.
+    # Caps default to REPORT_TRANSCRIPT_MAX_SEGMENTS / REPORT_TRANSCRIPT_MAX_CHARS.
+    if max_segments is None:
+        max_segments = config.TRANSCRIPT_MAX_SEGMENTS
+    if max_chars is None:
+        max_chars = config.TRANSCRIPT_MAX_CHARS
+    omitted = 0
+    omitted_start = omitted_end = None
+    for index, (start, end, text) in enumerate(iter_segments(transcript)):
+        if max_segments and index >= max_segments:
+            if not omitted:
+                omitted_start = start
+            omitted += 1
+            omitted_end = end if end is not None else omitted_end
+            continue
+        if max_chars and len(text) > max_chars:
+            text = text[:max_chars].rstrip() + "…"
+        yield "segment", start, end, text
+    if omitted:
+        yield "omitted", omitted_start, omitted_end, omitted
+
+
+def segment_label(start, end):
+    if start is None:
+        return ""
+    if end is None:
+        return f"[{format_timestamp(start)}]"
+    return f"[{format_timestamp(start)}–{format_timestamp(end)}]"
+
+
+def omitted_text(start, end, count):
+    span = f" ({format_timestamp(start)} to {format_timestamp(end)})" if start is not None and end is not None else ""
+    return f"… {count} further segments{span} not shown"
+
+
+def transcript_flowables(transcript, template, max_segments=None, max_chars=None):
+    # Generator of the appendix flowables, starting on a new page
+    yield PageBreak()
+    yield Paragraph("<b>Appendix: Transcript</b>", template.section_style)
+    yield Spacer(1, 6)
+    for kind, start, end, value in capped_segments(transcript, max_segments, max_chars):
+        if kind == "segment":
+            label = segment_label(start, end)
+            prefix = f"<b>{label}</b> " if label else ""
+            yield Paragraph(prefix + escape(value), template.normal_style)
+        else:
+            yield Paragraph(f"<i>{escape(omitted_text(start, end, value))}</i>", template.normal_style)
+
+
+class StreamedFlowables(list):
+    # Flowable list for doc.build() that is topped up from an iterator while the
+    # document is laid out. ReportLab consumes flowables from the front of the
+    # list and checks len() before each one, so keeping a short window buffered
+    # is enough; everything already drawn is released as it goes.
+    def __init__(self, flowables, more, window=64):
+        list.__init__(self, flowables)
+        self._more = iter(more)
+        self._window = window
+        self._fill()
+
+    def _fill(self):
+        while self._more is not None and list.__len__(self) < self._window:
+            try:
+                self.append(next(self._more))
+            except StopIteration:
+                self._more = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0